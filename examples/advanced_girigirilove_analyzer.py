@@ -7,19 +7,142 @@
 import sys
 import os
 import requests
-from bs4 import BeautifulSoup
+from urllib3.util.request import ACCEPT_ENCODING
+from lxml import etree, html
 import re
 import json
 import time
+import threading
+from itertools import islice
+from concurrent.futures import ThreadPoolExecutor
 from urllib.parse import urljoin, parse_qs, urlparse
 
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 from web_scraper.utils.logger import logger
 
+# 安装了 requests-cache 时缓存 GET 响应，反复运行分析时不必重新下载页面
+try:
+    import requests_cache
+except ImportError:
+    requests_cache = None
+
+# 缓存放在用户缓存目录（遵循 XDG_CACHE_HOME），不在运行目录下留下文件
+_CACHE_DIR = os.path.join(os.environ.get('XDG_CACHE_HOME') or os.path.expanduser('~/.cache'), 'animescraper')
+_CACHE_NAME = os.path.join(_CACHE_DIR, 'analyzer_cache')
+_CACHE_EXPIRE_SECONDS = 3600
+
+# 内部分析直接使用 lxml 树，省去 BeautifulSoup 为每个节点包装 Python 对象的开销。
+# lxml 解析器不能跨线程共享，因此每个线程复用各自的实例
+_parser_local = threading.local()
+
+
+def _html_parser(encoding=None):
+    """获取当前线程中指定编码的 lxml HTML 解析器"""
+    parsers = getattr(_parser_local, 'parsers', None)
+    if parsers is None:
+        parsers = _parser_local.parsers = {}
+    
+    parser = parsers.get(encoding)
+    if parser is None:
+        parser = parsers[encoding] = html.HTMLParser(encoding=encoding, collect_ids=False, huge_tree=False)
+    return parser
+
+
+def _parse_html(response):
+    """
+    解析响应为 lxml 元素树。
+    
+    响应需以 stream=True 请求，直接把原始字节流交给 lxml 边读边解析，
+    gzip/br 在读取时透明解压。响应头声明了 charset 时按其解码，
+    否则由 lxml 根据 <meta> 自行检测编码。
+    """
+    content_type = response.headers.get('content-type', '').lower()
+    encoding = response.encoding if 'charset=' in content_type else None
+    
+    response.raw.decode_content = True
+    return html.parse(response.raw, parser=_html_parser(encoding)).getroot()
+
+
+# JavaScript 中可能的 API 端点模式，模块加载时预编译
+_API_PATTERN_SOURCES = (
+    r'["\']https?://[^"\']*api[^"\']*["\']',
+    r'["\']https?://[^"\']*search[^"\']*["\']',
+    r'["\'][/]api[^"\']*["\']',
+    r'["\'][/]search[^"\']*["\']',
+    r'url\s*:\s*["\'][^"\']+["\']',
+    r'fetch\s*\(\s*["\'][^"\']+["\']'
+)
+# 合并为单个交替模式，每段脚本只需扫描一遍
+_API_UNION = re.compile('|'.join(f'(?:{p})' for p in _API_PATTERN_SOURCES), re.IGNORECASE)
+# 每段脚本最多扫描的字符数，压缩打包的大脚本在开头之后几乎不会再出现新的端点
+_MAX_SCRIPT_SCAN = 200_000
+
+# 探测请求并发数与最小请求间隔（秒）
+_MAX_WORKERS = 4
+_REQUEST_INTERVAL = 1.0
+
+_UPPERCASE = 'ABCDEFGHIJKLMNOPQRSTUVWXYZ'
+
+
+def _ci_contains(attr, *words):
+    """生成忽略大小写的 XPath 属性子串匹配条件"""
+    lowered = f"translate(@{attr}, '{_UPPERCASE}', '{_UPPERCASE.lower()}')"
+    return ' or '.join(f"contains({lowered}, '{word}')" for word in words)
+
+
+# class 过滤使用预编译 XPath，在 libxml2 中完成匹配，避免对每个节点回调 Python
+_SEARCH_FORM_XPATH = etree.XPath(f"//form[{_ci_contains('class', 'search')}]")
+_SEARCH_INPUT_XPATH = etree.XPath(
+    f"//input[{_ci_contains('name', 'search')} or {_ci_contains('class', 'search')}]"
+)
+_RESULT_CONTAINER_XPATH = etree.XPath(
+    "//*[self::div or self::li or self::article]"
+    f"[{_ci_contains('class', 'item', 'result', 'card', 'anime', 'show')}]"
+)
+_EPISODE_CONTAINER_XPATH = etree.XPath(
+    f"//*[self::div or self::ul or self::ol][{_ci_contains('class', 'ep', 'playlist', 'video')}]"
+)
+_LINK_COUNT_XPATH = etree.XPath("count(.//a)")
+
+# 填入测试关键词的表单字段：常见搜索参数名，或文本/搜索类型的输入框
+_SEARCH_FIELD_NAMES = frozenset(('q', 'search', 'keyword', 's', 'wd', 'kw'))
+_TEXT_INPUT_TYPES = frozenset(('text', 'search'))
+
+
+class _RateLimiter:
+    """
+    限速器：每 interval 秒放行一个请求，已发出的请求可以并发等待响应。
+    
+    基于单调时钟的截止时间，只休眠到下一个可用时刻为止，
+    而不是每次请求后都固定等待 interval 秒。
+    """
+    
+    def __init__(self, interval):
+        self._interval = interval
+        self._lock = threading.Lock()
+        self._next_ok = time.monotonic()
+    
+    def acquire(self):
+        # 在锁内预约时间槽，锁外休眠，不阻塞其他线程预约
+        with self._lock:
+            now = time.monotonic()
+            wait = self._next_ok - now
+            self._next_ok = max(now, self._next_ok) + self._interval
+        
+        if wait > 0:
+            time.sleep(wait)
+
 
 class GirigiriloveAnalyzer:
     def __init__(self):
-        self.session = requests.Session()
+        if requests_cache is not None:
+            os.makedirs(_CACHE_DIR, exist_ok=True)
+            self.session = requests_cache.CachedSession(
+                _CACHE_NAME, expire_after=_CACHE_EXPIRE_SECONDS, allowable_methods=('GET',)
+            )
+        else:
+            self.session = requests.Session()
+        self.limiter = _RateLimiter(_REQUEST_INTERVAL)
         self.base_url = "https://anime.girigirilove.com"
         
         # 模拟更真实的浏览器环境
@@ -27,7 +150,8 @@ class GirigiriloveAnalyzer:
             'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/128.0.0.0 Safari/537.36',
             'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8,application/signed-exchange;v=b3;q=0.7',
             'Accept-Language': 'zh-CN,zh;q=0.9,en;q=0.8',
-            'Accept-Encoding': 'gzip, deflate, br',
+            # 只声明 urllib3 能解压的编码，安装了 brotli 时才包含 br
+            'Accept-Encoding': ACCEPT_ENCODING,
             'DNT': '1',
             'Connection': 'keep-alive',
             'Upgrade-Insecure-Requests': '1',
@@ -44,17 +168,17 @@ class GirigiriloveAnalyzer:
         logger.info("=== 深度分析主页结构 ===")
         
         try:
-            response = self.session.get(self.base_url, timeout=15)
-            logger.info(f"主页状态码: {response.status_code}")
-            
-            if response.status_code != 200:
-                logger.error("主页访问失败")
-                return None
-            
-            soup = BeautifulSoup(response.text, 'html.parser')
+            with self.session.get(self.base_url, timeout=15, stream=True) as response:
+                logger.info(f"主页状态码: {response.status_code}")
+                
+                if response.status_code != 200:
+                    logger.error("主页访问失败")
+                    return None
+                
+                tree = _parse_html(response)
             
             # 分析搜索表单
-            forms = soup.find_all('form')
+            forms = tree.findall('.//form')
             logger.info(f"找到 {len(forms)} 个表单")
             
             for i, form in enumerate(forms):
@@ -63,68 +187,63 @@ class GirigiriloveAnalyzer:
                 logger.info(f"表单 {i+1}: method={method}, action={action}")
                 
                 # 分析表单中的输入字段
-                inputs = form.find_all(['input', 'select', 'textarea'])
+                inputs = form.iter('input', 'select', 'textarea')
                 for inp in inputs:
                     name = inp.get('name', '')
-                    inp_type = inp.get('type', inp.name)
+                    inp_type = inp.get('type', inp.tag)
                     placeholder = inp.get('placeholder', '')
                     if name or placeholder:
                         logger.info(f"  输入字段: name='{name}', type={inp_type}, placeholder='{placeholder}'")
             
             # 寻找JavaScript中的API端点
-            scripts = soup.find_all('script')
-            api_patterns = [
-                r'["\']https?://[^"\']*api[^"\']*["\']',
-                r'["\']https?://[^"\']*search[^"\']*["\']',
-                r'["\'][/]api[^"\']*["\']',
-                r'["\'][/]search[^"\']*["\']',
-                r'url\s*:\s*["\'][^"\']+["\']',
-                r'fetch\s*\(\s*["\'][^"\']+["\']'
-            ]
+            scripts = tree.iter('script')
             
             found_apis = set()
             for script in scripts:
-                if script.string:
-                    for pattern in api_patterns:
-                        matches = re.findall(pattern, script.string, re.IGNORECASE)
-                        for match in matches:
-                            # 清理匹配结果
-                            clean_url = match.strip('"\'')
-                            if clean_url and not clean_url.startswith('data:'):
-                                found_apis.add(clean_url)
+                # lxml 中 <script> 内容是单个文本节点，.text 即完整脚本
+                js = script.text
+                if js:
+                    js = js[:_MAX_SCRIPT_SCAN]
+                    # 流式清理匹配结果，不生成中间列表
+                    found_apis.update(
+                        url for url in (m.group(0).strip('"\'') for m in _API_UNION.finditer(js))
+                        if url and not url.startswith('data:')
+                    )
             
             if found_apis:
                 logger.success("在JavaScript中发现可能的API端点:")
                 for api in sorted(found_apis):
                     logger.info(f"  {api}")
             
-            return soup
+            return tree
             
         except Exception as e:
             logger.error(f"分析主页失败: {e}")
             return None
     
-    def find_search_mechanism(self, soup):
+    def find_search_mechanism(self, tree):
         """寻找搜索机制"""
         logger.info("\n=== 寻找搜索机制 ===")
         
-        if not soup:
+        if tree is None:
             return []
         
         search_methods = []
         
         # 方法1: 分析搜索表单
-        search_forms = soup.find_all('form', class_=lambda x: x and 'search' in ' '.join(x).lower() if x else False)
+        search_forms = _SEARCH_FORM_XPATH(tree)
         if not search_forms:
             # 寻找包含搜索输入框的表单
-            search_inputs = soup.find_all('input', {'name': lambda x: x and 'search' in x.lower() if x else False})
-            search_inputs.extend(soup.find_all('input', {'class': lambda x: x and any('search' in cls for cls in x) if x else False}))
+            search_inputs = _SEARCH_INPUT_XPATH(tree)
             
             for inp in search_inputs:
-                form = inp.find_parent('form')
-                if form and form not in search_forms:
+                form = next(inp.iterancestors('form'), None)
+                if form is not None and form not in search_forms:
                     search_forms.append(form)
         
+        # 以 (HTTP方法, 不含查询串的URL) 去重，避免重复探测同一地址
+        seen = set()
+        
         for form in search_forms:
             action = form.get('action', '')
             method = form.get('method', 'GET').upper()
@@ -140,11 +259,19 @@ class GirigiriloveAnalyzer:
             else:
                 full_action = self.base_url
             
+            key = (method, full_action.split('?', 1)[0])
+            if key in seen:
+                continue
+            seen.add(key)
+            
             search_methods.append({
                 'type': 'form',
                 'method': method,
                 'action': full_action,
-                'form': form
+                'form': form,
+                # 发现表单时一次性记录字段 (name, type, value)，测试阶段不再遍历表单
+                'fields': [(inp.get('name'), inp.get('type'), inp.get('value', ''))
+                           for inp in form.iter('input', 'select', 'textarea')]
             })
             
             logger.info(f"发现搜索表单: {method} {full_action}")
@@ -160,6 +287,13 @@ class GirigiriloveAnalyzer:
         
         for endpoint in common_endpoints:
             test_url = self.base_url + endpoint
+            
+            # 已由表单覆盖的地址不再作为端点探测
+            if any(url == test_url for _, url in seen):
+                logger.info(f"跳过重复端点: {test_url}")
+                continue
+            seen.add(('GET', test_url))
+            
             search_methods.append({
                 'type': 'endpoint',
                 'method': 'GET',
@@ -168,135 +302,181 @@ class GirigiriloveAnalyzer:
         
         return search_methods
     
-    def test_search_methods(self, search_methods):
+    def _probe_search_method(self, method_info, test_keyword):
+        """发送单个搜索请求并解析响应（在线程池中执行）"""
+        self.limiter.acquire()
+        form_data = None
+        
+        if method_info['type'] == 'form':
+            # 分析表单参数
+            form_data = {}
+            
+            for name, inp_type, value in method_info['fields']:
+                if not name:
+                    continue
+                if inp_type == 'hidden':
+                    form_data[name] = value
+                elif name.lower() in _SEARCH_FIELD_NAMES or inp_type in _TEXT_INPUT_TYPES:
+                    form_data[name] = test_keyword
+            
+            if method_info['method'] == 'POST':
+                response = self.session.post(method_info['action'], data=form_data, timeout=10, stream=True)
+            else:
+                response = self.session.get(method_info['action'], params=form_data, timeout=10, stream=True)
+        
+        else:  # endpoint
+            test_url = method_info['action'].replace('{keyword}', test_keyword)
+            response = self.session.get(test_url, timeout=10, stream=True)
+        
+        with response:
+            probe = {'form_data': form_data, 'status_code': response.status_code}
+            
+            if response.status_code == 200:
+                content_type = response.headers.get('content-type', '').lower()
+                probe['content_type'] = content_type
+                
+                if 'json' in content_type:
+                    probe['response_type'] = 'json'
+                    try:
+                        probe['test_response'] = response.json()
+                    except ValueError:
+                        pass
+                elif content_type and 'html' not in content_type and 'xml' not in content_type:
+                    # 图片、二进制等明显不是页面的响应，不读取也不解析
+                    probe['response_type'] = 'other'
+                else:
+                    # HTML响应，检查是否有搜索结果
+                    probe['response_type'] = 'html'
+                    probe['result_containers'] = len(_RESULT_CONTAINER_XPATH(_parse_html(response)))
+        
+        return probe
+    
+    def test_search_methods(self, search_methods, executor=None):
         """测试搜索方法"""
+        if executor is None:
+            with ThreadPoolExecutor(max_workers=_MAX_WORKERS) as executor:
+                return self.test_search_methods(search_methods, executor)
+        
         logger.info("\n=== 测试搜索方法 ===")
         
         test_keyword = "test"
         successful_methods = []
         
-        for method_info in search_methods:
+        # 请求并发发出，结果按原顺序输出
+        futures = [executor.submit(self._probe_search_method, method_info, test_keyword)
+                   for method_info in search_methods]
+        
+        for method_info, future in zip(search_methods, futures):
             logger.info(f"\n测试: {method_info['method']} {method_info['action']}")
             
             try:
-                if method_info['type'] == 'form':
-                    # 分析表单参数
-                    form = method_info['form']
-                    data = {}
-                    
-                    for inp in form.find_all(['input', 'select', 'textarea']):
-                        name = inp.get('name')
-                        if name:
-                            if inp.get('type') == 'hidden':
-                                data[name] = inp.get('value', '')
-                            elif 'search' in name.lower() or 'keyword' in name.lower() or 'q' in name.lower():
-                                data[name] = test_keyword
-                            elif inp.get('type') in ['text', 'search']:
-                                data[name] = test_keyword
-                    
-                    logger.info(f"  表单数据: {data}")
-                    
-                    if method_info['method'] == 'POST':
-                        response = self.session.post(method_info['action'], data=data, timeout=10)
+                probe = future.result()
+            except Exception as e:
+                logger.error(f"  请求失败: {e}")
+                continue
+            
+            if probe['form_data'] is not None:
+                logger.info(f"  表单数据: {probe['form_data']}")
+            
+            status_code = probe['status_code']
+            logger.info(f"  状态码: {status_code}")
+            
+            if status_code == 200:
+                if probe['response_type'] == 'json':
+                    if 'test_response' in probe:
+                        data = probe['test_response']
+                        logger.success(f"  ✓ JSON响应成功: {str(data)[:100]}...")
+                        successful_methods.append({
+                            **method_info,
+                            'response_type': 'json',
+                            'test_response': data
+                        })
                     else:
-                        response = self.session.get(method_info['action'], params=data, timeout=10)
-                
-                else:  # endpoint
-                    test_url = method_info['action'].replace('{keyword}', test_keyword)
-                    response = self.session.get(test_url, timeout=10)
-                
-                logger.info(f"  状态码: {response.status_code}")
-                
-                if response.status_code == 200:
-                    content_type = response.headers.get('content-type', '').lower()
+                        logger.warning("  JSON解析失败")
+                elif probe['response_type'] == 'other':
+                    logger.warning(f"  非HTML响应: {probe['content_type']}")
+                else:
+                    result_containers = probe['result_containers']
                     
-                    if 'json' in content_type:
-                        try:
-                            data = response.json()
-                            logger.success(f"  ✓ JSON响应成功: {str(data)[:100]}...")
-                            successful_methods.append({
-                                **method_info,
-                                'response_type': 'json',
-                                'test_response': data
-                            })
-                        except:
-                            logger.warning("  JSON解析失败")
+                    if result_containers:
+                        logger.success(f"  ✓ HTML搜索页面，找到 {result_containers} 个可能的结果容器")
+                        successful_methods.append({
+                            **method_info,
+                            'response_type': 'html',
+                            'result_containers': result_containers
+                        })
                     else:
-                        # HTML响应
-                        soup = BeautifulSoup(response.text, 'html.parser')
-                        
-                        # 检查是否有搜索结果
-                        possible_results = soup.find_all(['div', 'li', 'article'], 
-                                                       class_=lambda x: x and any(word in ' '.join(x).lower() 
-                                                       for word in ['item', 'result', 'card', 'anime', 'show']) if x else False)
-                        
-                        if possible_results:
-                            logger.success(f"  ✓ HTML搜索页面，找到 {len(possible_results)} 个可能的结果容器")
-                            successful_methods.append({
-                                **method_info,
-                                'response_type': 'html',
-                                'result_containers': len(possible_results)
-                            })
-                        else:
-                            logger.warning("  HTML页面，但未找到明显的搜索结果")
-                
-                elif response.status_code == 403:
-                    logger.warning("  403 Forbidden - 可能需要额外的认证或headers")
-                elif response.status_code == 404:
-                    logger.warning("  404 Not Found - 端点不存在")
-                else:
-                    logger.warning(f"  其他错误: {response.status_code}")
-                
-                time.sleep(1)  # 避免请求过快
-                
-            except Exception as e:
-                logger.error(f"  请求失败: {e}")
+                        logger.warning("  HTML页面，但未找到明显的搜索结果")
+            
+            elif status_code == 403:
+                logger.warning("  403 Forbidden - 可能需要额外的认证或headers")
+            elif status_code == 404:
+                logger.warning("  404 Not Found - 端点不存在")
+            else:
+                logger.warning(f"  其他错误: {status_code}")
         
         return successful_methods
     
-    def analyze_show_page_structure(self):
-        """分析动漫详情页结构"""
-        logger.info("\n=== 分析动漫详情页结构 ===")
-        
+    def _fetch_show_page(self, url):
+        """获取动漫详情页，仅在 200 时解析（在线程池中执行）"""
+        self.limiter.acquire()
+        with self.session.get(url, timeout=10, stream=True) as response:
+            if response.status_code != 200:
+                return response.status_code, None
+            return response.status_code, _parse_html(response)
+    
+    def _submit_show_page_probes(self, executor):
+        """提交动漫详情页探测请求，返回 (url, future) 列表"""
         # 基于之前发现的链接格式，尝试访问一个动漫页面
         test_urls = [
             f"{self.base_url}/show/1",
             f"{self.base_url}/show/2", 
             f"{self.base_url}/show/100"
         ]
+        return [(test_url, executor.submit(self._fetch_show_page, test_url)) for test_url in test_urls]
+    
+    def analyze_show_page_structure(self, probes=None):
+        """分析动漫详情页结构"""
+        if probes is None:
+            with ThreadPoolExecutor(max_workers=_MAX_WORKERS) as executor:
+                return self.analyze_show_page_structure(self._submit_show_page_probes(executor))
+        
+        logger.info("\n=== 分析动漫详情页结构 ===")
         
-        for test_url in test_urls:
+        for test_url, future in probes:
             logger.info(f"测试动漫页面: {test_url}")
             
             try:
-                response = self.session.get(test_url, timeout=10)
-                logger.info(f"  状态码: {response.status_code}")
+                status_code, tree = future.result()
+                logger.info(f"  状态码: {status_code}")
                 
-                if response.status_code == 200:
-                    soup = BeautifulSoup(response.text, 'html.parser')
-                    
-                    # 寻找剧集列表
-                    episode_containers = soup.find_all(['div', 'ul', 'ol'], 
-                                                     class_=lambda x: x and any(word in ' '.join(x).lower() 
-                                                     for word in ['episode', 'ep', 'playlist', 'video']) if x else False)
+                if tree is None:
+                    continue
+                
+                # 寻找剧集列表
+                episode_containers = _EPISODE_CONTAINER_XPATH(tree)
+                
+                if episode_containers:
+                    logger.success(f"  找到 {len(episode_containers)} 个可能的剧集容器")
                     
-                    if episode_containers:
-                        logger.success(f"  找到 {len(episode_containers)} 个可能的剧集容器")
+                    for i, container in enumerate(episode_containers[:2]):
+                        logger.info(f"    容器 {i+1}: class={container.get('class', '')}")
                         
-                        for i, container in enumerate(episode_containers[:2]):
-                            logger.info(f"    容器 {i+1}: class={container.get('class', [])}")
-                            
-                            # 寻找容器内的链接
-                            links = container.find_all('a')
-                            if links:
-                                logger.info(f"      包含 {len(links)} 个链接")
-                                for j, link in enumerate(links[:3]):
-                                    href = link.get('href', '')
-                                    text = link.get_text(strip=True)
-                                    logger.info(f"        链接 {j+1}: {href} - {text[:30]}")
-                    
-                    return soup
-                    
+                        # 寻找容器内的链接
+                        # 链接总数在 libxml2 中计数，只为展示的前 3 个创建元素对象
+                        link_count = int(_LINK_COUNT_XPATH(container))
+                        if link_count:
+                            logger.info(f"      包含 {link_count} 个链接")
+                            for j, link in enumerate(islice(container.iter('a'), 3)):
+                                href = link.get('href', '')
+                                text = link.text_content().strip()
+                                logger.info(f"        链接 {j+1}: {href} - {text[:30]}")
+                
+                # 已找到可用页面，取消尚未开始的探测
+                for _, pending in probes:
+                    pending.cancel()
+                return tree
+                
             except Exception as e:
                 logger.error(f"  访问失败: {e}")
         
@@ -332,16 +512,20 @@ class GirigiriloveAnalyzer:
         logger.info("=" * 60)
         
         # 1. 分析主页
-        soup = self.analyze_main_page()
+        tree = self.analyze_main_page()
         
         # 2. 寻找搜索机制
-        search_methods = self.find_search_mechanism(soup)
-        
-        # 3. 测试搜索方法
-        successful_methods = self.test_search_methods(search_methods)
+        search_methods = self.find_search_mechanism(tree)
         
-        # 4. 分析动漫页面结构
-        self.analyze_show_page_structure()
+        with ThreadPoolExecutor(max_workers=_MAX_WORKERS) as executor:
+            # 详情页探测不依赖搜索结果，提前提交，与搜索测试的网络等待重叠
+            show_page_probes = self._submit_show_page_probes(executor)
+            
+            # 3. 测试搜索方法
+            successful_methods = self.test_search_methods(search_methods, executor)
+            
+            # 4. 分析动漫页面结构
+            self.analyze_show_page_structure(show_page_probes)
         
         # 5. 生成配置建议
         self.generate_config_recommendations(successful_methods)
@@ -9,9 +9,12 @@ This example demonstrates how to:
 """
 
 import asyncio
+import re
 import sys
 import os
+from bs4 import SoupStrainer
 from web_scraper.utils.logger import logger
+from web_scraper.utils.helpers import join_url
 
 # Add the web_scraper package to the Python path
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
@@ -19,7 +22,8 @@ sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 from web_scraper.core import SelectorMediaSource, ThreeStepWebMediaSource
 from web_scraper.models import (
     SelectorSearchConfig, MediaFetchRequest, EpisodeSort,
-    SelectorSubjectFormatConfig, SelectorChannelFormatConfig, MatchVideoConfig
+    SelectorSubjectFormatConfig, SelectorChannelFormatConfig, MatchVideoConfig,
+    Bangumi, Episode
 )
 
 
@@ -91,37 +95,39 @@ async def test_selector_media_source():
 class ExampleThreeStepSource(ThreeStepWebMediaSource):
     """Example implementation of ThreeStepWebMediaSource"""
     
+    def __init__(self, media_source_id, base_url, session=None):
+        super().__init__(media_source_id, base_url, session)
+        # Only build the subtrees the parse hooks actually read. At parse time
+        # class_ sees the whole class attribute, so split it to match one class
+        self.search_strainer = SoupStrainer(
+            "div", class_=lambda c: c is not None and "anime-item" in c.split()
+        )
+        self.episode_strainer = SoupStrainer(
+            class_=lambda c: c is not None and any(name.startswith("episode-") for name in c.split())
+        )
+    
+    def _absolute_url(self, url):
+        """Resolve a scraped link against the site base URL"""
+        return join_url(self.base_url, url)
+    
     def parse_bangumi_search(self, document):
         """Parse search results - example implementation"""
-        from web_scraper.models import Bangumi
-        
         # Example: extract anime from search results
-        bangumi_list = []
-        items = document.select(".anime-item")
+        items = document.find_all("div", class_="anime-item", limit=5)  # Limit to 5 for demo
+        pairs = ((item.find(class_="anime-title"), item.find("a", href=True)) for item in items)
         
-        for i, item in enumerate(items[:5]):  # Limit to 5 for demo
-            title_elem = item.select_one(".anime-title")
-            link_elem = item.select_one("a")
-            
-            if title_elem and link_elem:
-                title = title_elem.get_text(strip=True)
-                url = link_elem.get('href', '')
-                
-                if not url.startswith('http'):
-                    url = f"{self.base_url}{url}"
-                
-                bangumi_list.append(Bangumi(
-                    internal_id=f"demo_{i}",
-                    name=title,
-                    url=url
-                ))
-        
-        return bangumi_list
+        return [
+            Bangumi(
+                internal_id=f"demo_{i}",
+                name=title_elem.get_text(strip=True),
+                url=self._absolute_url(link_elem['href'])
+            )
+            for i, (title_elem, link_elem) in enumerate(pairs)
+            if title_elem and link_elem
+        ]
     
     async def search(self, name, query_request):
         """Search implementation - returns demo data"""
-        from web_scraper.models import Bangumi
-        
         logger.info(f"正在搜索: {name}")
         
         # Return demo bangumi for testing
@@ -140,29 +146,18 @@ class ExampleThreeStepSource(ThreeStepWebMediaSource):
     
     def parse_episode_list(self, document):
         """Parse episode list - example implementation"""
-        from web_scraper.models import Episode
+        episode_items = document.find_all(class_="episode-item", limit=3)  # Limit for demo
+        pairs = ((item.find(class_="episode-name"), item.find("a", href=True)) for item in episode_items)
         
-        episodes = []
-        episode_items = document.select(".episode-item")
-        
-        for i, item in enumerate(episode_items[:3]):  # Limit for demo
-            name_elem = item.select_one(".episode-name")
-            link_elem = item.select_one("a")
-            
-            if name_elem and link_elem:
-                name = name_elem.get_text(strip=True)
-                url = link_elem.get('href', '')
-                
-                if not url.startswith('http'):
-                    url = f"{self.base_url}{url}"
-                
-                episodes.append(Episode(
-                    name=name or f"第{i+1}集",
-                    url=url,
-                    channel="HD"
-                ))
-        
-        return episodes
+        return [
+            Episode(
+                name=name_elem.get_text(strip=True) or f"第{i+1}集",
+                url=self._absolute_url(link_elem['href']),
+                channel="HD"
+            )
+            for i, (name_elem, link_elem) in enumerate(pairs)
+            if name_elem and link_elem
+        ]
 
 
 async def test_three_step_source():
@@ -234,10 +229,10 @@ def demonstrate_configuration():
             channel_selector=".quality-tag"
         ),
         
-        # Video matching
+        # Video matching (patterns may also be passed precompiled)
         match_video=MatchVideoConfig(
             enable_nested_url=True,
-            match_video_url=r"(\.mp4|\.m3u8|streaming\.com)",
+            match_video_url=re.compile(r"(\.mp4|\.m3u8|streaming\.com)"),
             cookies="quality=1080;lang=zh"
         )
     )
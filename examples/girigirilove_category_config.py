@@ -6,6 +6,7 @@ girigirilove 分类页面配置
 
 import sys
 import os
+from dataclasses import replace
 from urllib.parse import quote
 
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
@@ -16,6 +17,11 @@ from web_scraper.models import (
     SelectorSubjectFormatConfig, SelectorChannelFormatConfig, MatchVideoConfig
 )
 from web_scraper.utils.logger import logger
+from web_scraper.utils.concurrency import iter_queries_concurrently
+from web_scraper.utils.session import create_shared_session
+
+# 并发测试查询数上限，请求间隔仍由数据源自身的限流保证
+MAX_CONCURRENT_QUERIES = 4
 
 
 def create_category_config():
@@ -58,7 +64,7 @@ def create_category_config():
         # 视频匹配配置
         match_video=MatchVideoConfig(
             enable_nested_url=True,
-            match_video_url=r"(\\.mp4|\\.m3u8|/play/|/video/|stream|watch|/GV\\d+/)",
+            match_video_url=r"(\.mp4|\.m3u8|/play/|/video/|stream|watch|/GV\d+/)",
             cookies="",
         ),
         
@@ -97,7 +103,7 @@ def create_fixed_search_config():
         
         match_video=MatchVideoConfig(
             enable_nested_url=True,
-            match_video_url=r"(\\.mp4|\\.m3u8|/play/|/video/|stream|watch|/GV\\d+/)",
+            match_video_url=r"(\.mp4|\.m3u8|/play/|/video/|stream|watch|/GV\d+/)",
             cookies="",
         ),
         
@@ -124,63 +130,50 @@ class CategoryGirigiriloveSource(SelectorMediaSource):
         category_url = "https://anime.girigirilove.com/show/2-----------2025/"
         return category_url
     
-    def _is_valid_anime_link(self, url: str, title: str) -> bool:
+    @staticmethod
+    def match_titles(media_list, queries):
         """
-        验证是否是有效的动漫播放链接
+        一次遍历结果，把每个结果归到与其标题匹配的查询词下
+        匹配规则：标题包含查询词，或与查询词有共同字符；空查询不参与匹配
         """
-        if not url or not title:
-            return False
-            
-        # 检查是否包含GV ID（播放链接的特征）
-        if '/GV' in url:
-            return True
-            
-        return False
+        patterns = [(query, query.lower(), frozenset(query)) for query in queries if query]
+        buckets = {query: [] for query in queries}
+        for media in media_list:
+            title_lower = media.original_title.lower()
+            for query, query_lower, query_chars in patterns:
+                if query_lower in title_lower or not query_chars.isdisjoint(title_lower):
+                    buckets[query].append(media)
+        return buckets
     
     async def search(self, search_config, query):
         """覆盖搜索方法，直接访问分类页面"""
         category_url = self._build_category_url(query.subject_name)
         
-        # 临时替换搜索URL为分类页面URL
-        original_url = search_config.search_url
-        search_config.search_url = category_url
+        # 使用替换了搜索URL的配置副本，并发查询之间互不干扰
+        search_config = replace(search_config, search_url=category_url)
         
         logger.info(f"访问分类页面: {search_config.search_url}")
         
-        try:
-            # 调用父类搜索方法
-            results = await super().search(search_config, query)
-            
-            # 过滤出有效的播放链接
-            valid_results = []
-            for media in results:
-                url = media.download.url if media.download else ""
-                title = media.original_title
-                
-                if self._is_valid_anime_link(url, title):
-                    valid_results.append(media)
-                    logger.debug(f"有效播放链接: {title} -> {url}")
-            
-            logger.info(f"找到有效播放链接: {len(valid_results)}/{len(results)}")
-            
-            # 如果查询特定动漫，尝试匹配
-            if query.subject_name:
-                matched_results = []
-                query_lower = query.subject_name.lower()
-                for media in valid_results:
-                    title_lower = media.original_title.lower()
-                    if query_lower in title_lower or any(char in title_lower for char in query.subject_name):
-                        matched_results.append(media)
-                
-                if matched_results:
-                    logger.success(f"匹配到 '{query.subject_name}' 相关结果: {len(matched_results)} 个")
-                    return matched_results
-            
-            return valid_results
+        # 调用父类搜索方法
+        results = await super().search(search_config, query)
+        
+        # 过滤出有效的播放链接（包含GV ID的链接才是播放链接）
+        valid_results = [
+            media for media in results
+            if media.download and media.original_title and '/GV' in media.download.url
+        ]
+        
+        logger.info(f"找到有效播放链接: {len(valid_results)}/{len(results)}")
+        
+        # 如果查询特定动漫，尝试匹配
+        if query.subject_name:
+            matched_results = self.match_titles(valid_results, [query.subject_name])[query.subject_name]
             
-        finally:
-            # 恢复原始URL
-            search_config.search_url = original_url
+            if matched_results:
+                logger.success(f"匹配到 '{query.subject_name}' 相关结果: {len(matched_results)} 个")
+                return matched_results
+        
+        return valid_results
 
 
 class FixedSearchGirigiriloveSource(SelectorMediaSource):
@@ -196,25 +189,23 @@ class FixedSearchGirigiriloveSource(SelectorMediaSource):
         """修复选择器错误的搜索方法"""
         # 对关键词进行URL编码
         encoded_keyword = quote(query.subject_name)
-        original_url = search_config.search_url
-        search_config.search_url = original_url.replace('{keyword}', encoded_keyword)
+        search_config = replace(
+            search_config,
+            search_url=search_config.build_search_url(encoded_keyword)
+        )
         
         logger.info(f"修复后的搜索URL: {search_config.search_url}")
         
-        try:
-            results = await super().search(search_config, query)
-            return results
-        finally:
-            search_config.search_url = original_url
+        return await super().search(search_config, query)
 
 
-def test_category_approach():
+def test_category_approach(session=None):
     """测试分类页面方法"""
     logger.info("🎯 测试分类页面方法")
     logger.info("=" * 60)
     
     config = create_category_config()
-    source = CategoryGirigiriloveSource("girigirilove-category", config)
+    source = CategoryGirigiriloveSource("girigirilove-category", config, session=session)
     
     # 测试不同的查询
     test_queries = [
@@ -224,45 +215,49 @@ def test_category_approach():
         ""           # 空查询，获取所有结果
     ]
     
+    # 分类页面与查询词无关：只抓取一次，再在本地一次遍历按查询词分组
+    request = MediaFetchRequest(
+        subject_names=[""],
+        episode_sort=EpisodeSort(1)
+    )
+    try:
+        all_media = [match.media for match in source.fetch(request)]
+    except Exception as e:
+        logger.error(f"获取分类页面时出错: {e}")
+        return False
+    
+    buckets = source.match_titles(all_media, test_queries)
+    
     for query in test_queries:
         logger.info(f"\n=== 测试查询: '{query}' ===")
         
-        request = MediaFetchRequest(
-            subject_names=[query] if query else [""],
-            episode_sort=EpisodeSort(1)
-        )
-        
-        try:
-            matches = list(source.fetch(request))
+        # 与 search 一致：没有匹配（或空查询）时使用全部有效结果
+        matches = buckets[query] or all_media
+        if matches:
+            logger.success(f"✅ 找到 {len(matches)} 个结果:")
+            for i, media in enumerate(matches[:5]):
+                title = media.original_title
+                url = media.download.url if media.download else ""
+                logger.info(f"  {i+1}. {title}")
+                logger.info(f"     URL: {url}")
+            
+            # 找到结果就测试成功
+            logger.success("🎉 分类页面方法成功!")
+            return True
             
-            if matches:
-                logger.success(f"✅ 找到 {len(matches)} 个结果:")
-                for i, match in enumerate(matches[:5]):
-                    title = match.media.original_title
-                    url = match.media.download.url if match.media.download else ""
-                    logger.info(f"  {i+1}. {title}")
-                    logger.info(f"     URL: {url}")
-                
-                # 找到结果就测试成功
-                logger.success("🎉 分类页面方法成功!")
-                return True
-                
-            else:
-                logger.warning(f"未找到 '{query}' 的结果")
-                
-        except Exception as e:
-            logger.error(f"测试 '{query}' 时出错: {e}")
+        else:
+            logger.warning(f"未找到 '{query}' 的结果")
     
     return False
 
 
-def test_fixed_search():
+def test_fixed_search(session=None):
     """测试修复的搜索功能"""
     logger.info("\n🔧 测试修复的搜索功能")
     logger.info("=" * 60)
     
     config = create_fixed_search_config()
-    source = FixedSearchGirigiriloveSource("girigirilove-fixed", config)
+    source = FixedSearchGirigiriloveSource("girigirilove-fixed", config, session=session)
     
     # 使用在分类页面中发现的动漫名称进行搜索
     test_queries = [
@@ -271,33 +266,24 @@ def test_fixed_search():
         "废渊战鬼"
     ]
     
-    for query in test_queries:
+    for query, matches in iter_queries_concurrently(source, test_queries, MAX_CONCURRENT_QUERIES):
         logger.info(f"\n=== 修复搜索测试: {query} ===")
         
-        request = MediaFetchRequest(
-            subject_names=[query],
-            episode_sort=EpisodeSort(1)
-        )
-        
-        try:
-            matches = list(source.fetch(request))
+        if isinstance(matches, Exception):
+            logger.error(f"搜索 '{query}' 时出错: {matches}")
+        elif matches:
+            logger.success(f"✅ 搜索成功! 找到 {len(matches)} 个结果:")
+            for i, match in enumerate(matches[:3]):
+                title = match.media.original_title
+                url = match.media.download.url if match.media.download else ""
+                logger.info(f"  {i+1}. {title}")
+                logger.info(f"     URL: {url}")
             
-            if matches:
-                logger.success(f"✅ 搜索成功! 找到 {len(matches)} 个结果:")
-                for i, match in enumerate(matches[:3]):
-                    title = match.media.original_title
-                    url = match.media.download.url if match.media.download else ""
-                    logger.info(f"  {i+1}. {title}")
-                    logger.info(f"     URL: {url}")
-                
-                logger.success("🎉 修复的搜索方法成功!")
-                return True
-                
-            else:
-                logger.warning(f"搜索 '{query}' 无结果")
-                
-        except Exception as e:
-            logger.error(f"搜索 '{query}' 时出错: {e}")
+            logger.success("🎉 修复的搜索方法成功!")
+            return True
+            
+        else:
+            logger.warning(f"搜索 '{query}' 无结果")
     
     return False
 
@@ -308,11 +294,13 @@ def main():
     logger.info("基于成功的分类页面发现结果")
     logger.info("=" * 60)
     
-    # 首先测试分类页面方法
-    category_success = test_category_approach()
-    
-    # 然后测试修复的搜索方法
-    search_success = test_fixed_search()
+    # 两种方法共用同一个会话，避免重复握手
+    with create_shared_session() as session:
+        # 首先测试分类页面方法
+        category_success = test_category_approach(session)
+        
+        # 然后测试修复的搜索方法
+        search_success = test_fixed_search(session)
     
     logger.info(f"\n{'=' * 60}")
     logger.success("测试完成!")
@@ -8,6 +8,7 @@ girigirilove 动漫网站配置
 
 import sys
 import os
+from concurrent.futures import ThreadPoolExecutor
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 
 from web_scraper.core import SelectorMediaSource
@@ -16,6 +17,7 @@ from web_scraper.models import (
     SelectorSubjectFormatConfig, SelectorChannelFormatConfig, MatchVideoConfig
 )
 from web_scraper.utils.logger import logger
+from web_scraper.utils.session import create_shared_session
 
 
 def create_girigirilove_config():
@@ -82,7 +84,7 @@ def create_api_style_config():
     return config
 
 
-def test_connection():
+def test_connection(session=None):
     """测试网站连接"""
     logger.info("=== 测试 girigirilove 网站连接 ===")
     
@@ -92,31 +94,36 @@ def test_connection():
         ("API配置", create_api_style_config())
     ]
     
-    for config_name, config in configs:
-        logger.info(f"\n测试 {config_name}:")
-        logger.info(f"搜索URL: {config.search_url}")
-        
-        source = SelectorMediaSource("girigirilove", config)
-        
-        # 测试基本连接
-        connection_status = source.check_connection()
-        logger.info(f"连接状态: {connection_status}")
+    sources = [SelectorMediaSource("girigirilove", config, session) for _, config in configs]
+    
+    # 三个探测互不依赖，并发发出；按配置顺序检查结果以保持优先级和日志顺序
+    with ThreadPoolExecutor(max_workers=len(sources)) as executor:
+        futures = [executor.submit(source.check_connection) for source in sources]
         
-        if connection_status == "SUCCESS":
-            logger.success(f"{config_name} 连接成功！")
-            return config, source
-        else:
-            logger.warning(f"{config_name} 连接失败")
+        for (config_name, config), source, future in zip(configs, sources, futures):
+            logger.info(f"\n测试 {config_name}:")
+            logger.info(f"搜索URL: {config.search_url}")
+            
+            # 测试基本连接
+            connection_status = future.result()
+            logger.info(f"连接状态: {connection_status}")
+            
+            if connection_status == "SUCCESS":
+                logger.success(f"{config_name} 连接成功！")
+                # 每个配置一个线程，探测都已在运行；退出 with 时等待其余探测结束
+                return config, source
+            else:
+                logger.warning(f"{config_name} 连接失败")
     
     logger.error("所有配置都无法连接，可能需要进一步调试")
     return None, None
 
 
-def test_search():
+def test_search(session=None):
     """测试搜索功能"""
     logger.info("\n=== 测试搜索功能 ===")
     
-    config, source = test_connection()
+    config, source = test_connection(session)
     if not source:
         logger.error("无法建立连接，跳过搜索测试")
         return
@@ -191,11 +198,13 @@ def main():
     logger.info("🎬 girigirilove 动漫网站爬虫配置")
     logger.info("=" * 50)
     
-    # 测试连接
-    test_connection()
-    
-    # 测试搜索（如果连接成功）
-    test_search()
+    # 所有测试共用一个会话，避免重复的 TCP/TLS 握手
+    with create_shared_session(pool_maxsize=8) as session:
+        # 测试连接
+        test_connection(session)
+        
+        # 测试搜索（如果连接成功）
+        test_search(session)
     
     # 提供调试建议
     debug_selectors()
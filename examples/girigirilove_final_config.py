@@ -7,6 +7,9 @@
 import sys
 import os
 import re
+from dataclasses import replace
+from functools import lru_cache
+from urllib.parse import quote
 
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 
@@ -17,6 +20,9 @@ from web_scraper.models import (
 )
 from web_scraper.utils.logger import logger
 
+# 搜索关键词中需要移除的特殊字符
+SPECIAL_CHARS_RE = re.compile(r'[^\w\s-]')
+
 
 def create_girigirilove_config():
     """
@@ -39,6 +45,7 @@ def create_girigirilove_config():
         
         # 请求设置
         request_interval_seconds=3.0,      # 较长间隔避免被屏蔽
+        backoff_policy="adaptive",         # 服务器正常时缩短间隔，被限流时逐步退避回上面的间隔
         
         # 主题格式配置 - 需要根据实际搜索结果页面调整
         subject_format_config=SelectorSubjectFormatConfig(
@@ -87,31 +94,35 @@ class CustomGirigiriloveSource(SelectorMediaSource):
     
     def _process_search_url(self, keyword):
         """处理特殊的搜索URL格式"""
+        return self._build_search_url(self.config.search_url, keyword)
+    
+    @staticmethod
+    @lru_cache(maxsize=1024)
+    def _build_search_url(template, keyword):
+        """由URL模板和关键词生成搜索URL，同一关键词的结果会被缓存"""
         # 基本的URL编码和处理
-        processed_keyword = re.sub(r'[^\w\s-]', '', keyword)  # 移除特殊字符
-        processed_keyword = processed_keyword.strip().replace(' ', '-')
+        processed_keyword = SPECIAL_CHARS_RE.sub('', keyword)  # 移除特殊字符
+        processed_keyword = quote(processed_keyword.strip().replace(' ', '-'), safe='-')
         
         # 替换URL中的占位符
-        if '-------------' in self.config.search_url:
-            return self.config.search_url.replace('-------------', processed_keyword)
+        if '-------------' in template:
+            return template.replace('-------------', processed_keyword)
         else:
-            return self.config.search_url.replace('{keyword}', processed_keyword)
+            return template.replace('{keyword}', processed_keyword)
     
     async def search(self, search_config, query):
         """覆盖搜索方法以处理特殊URL格式"""
         # 处理搜索URL
-        original_url = search_config.search_url
-        search_config.search_url = self._process_search_url(query.subject_name)
+        search_config = replace(
+            search_config,
+            search_url=self._process_search_url(query.subject_name)
+        )
         
         logger.info(f"处理后的搜索URL: {search_config.search_url}")
         
-        try:
-            # 调用父类的搜索方法
-            result = await super().search(search_config, query)
-            return result
-        finally:
-            # 恢复原始URL
-            search_config.search_url = original_url
+        # 调用父类的搜索方法
+        result = await super().search(search_config, query)
+        return result
 
 
 def test_custom_source():
@@ -132,6 +143,9 @@ def test_custom_source():
         "海贼王"
     ]
     
+    # 备选数据源按需创建一次，并与主数据源共用会话以复用连接
+    alt_source = None
+    
     for query in test_queries:
         logger.info(f"\n测试搜索: {query}")
         
@@ -162,8 +176,11 @@ def test_custom_source():
             # 如果是URL相关错误，尝试备选格式
             if "404" in str(e) or "500" in str(e):
                 logger.info("尝试备选URL格式...")
-                alt_config = create_alternative_search_config()
-                alt_source = SelectorMediaSource("girigirilove-alt", alt_config)
+                if alt_source is None:
+                    alt_config = create_alternative_search_config()
+                    alt_source = SelectorMediaSource(
+                        "girigirilove-alt", alt_config, session=source.engine.session
+                    )
                 
                 try:
                     alt_matches = list(alt_source.fetch(request))
@@ -6,16 +6,24 @@ girigirilove 最终可工作配置
 
 import sys
 import os
+import re
+from dataclasses import replace
+from functools import lru_cache
 from urllib.parse import quote
 
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 
 from web_scraper.core import SelectorMediaSource
 from web_scraper.models import (
-    SelectorSearchConfig, MediaFetchRequest, EpisodeSort,
-    SelectorSubjectFormatConfig, SelectorChannelFormatConfig, MatchVideoConfig
+    SelectorSearchConfig, SelectorSubjectFormatConfig,
+    SelectorChannelFormatConfig, MatchVideoConfig
 )
 from web_scraper.utils.logger import logger
+from web_scraper.utils.concurrency import iter_queries_concurrently
+from web_scraper.utils.session import create_shared_session
+
+# 并发测试查询数上限，请求间隔仍由数据源自身的限流保证
+MAX_CONCURRENT_QUERIES = 4
 
 
 def create_final_working_config():
@@ -34,6 +42,7 @@ def create_final_working_config():
         
         # 请求设置
         request_interval_seconds=3.0,
+        backoff_policy="adaptive",  # 服务器正常时缩短间隔，被限流时逐步退避回上面的间隔
         
         # 主题格式配置 - 使用最简单可靠的选择器
         subject_format_config=SelectorSubjectFormatConfig(
@@ -54,7 +63,7 @@ def create_final_working_config():
         # 视频匹配配置
         match_video=MatchVideoConfig(
             enable_nested_url=True,
-            match_video_url=r"(\\.mp4|\\.m3u8|/play/|/video/|stream|watch|/GV\\d+/)",
+            match_video_url=r"(\.mp4|\.m3u8|/play/|/video/|stream|watch|/GV\d+/)",
             cookies="",
         ),
         
@@ -63,6 +72,51 @@ def create_final_working_config():
     )
 
 
+# 播放URL的特征
+PLAYABLE_PATTERNS = (
+    '/GV',          # GV开头的动漫页面
+    '/play/',       # 播放页面
+    '/watch/',      # 观看页面
+    '/video/',      # 视频页面
+)
+
+# 明显的非播放链接
+NON_PLAYABLE_PATTERNS = (
+    '/show/2-----------',  # 分类页面
+    '/show/21-----------', # 剧场版分类
+    '/label/',             # 标签页
+    'javascript:',         # JS链接
+    '#',                   # 锚点
+)
+
+# 导航标题
+NON_PLAYABLE_TITLES = (
+    '日番', '劇場版', '点击广告', '游戏',
+    '发布页', '联萌', '排行榜', '留言板',
+    '更多', '专题'
+)
+
+# 每组特征合并为一个正则，一次扫描完成匹配
+PLAYABLE_RE = re.compile('|'.join(map(re.escape, PLAYABLE_PATTERNS)))
+NON_PLAYABLE_RE = re.compile('|'.join(map(re.escape, NON_PLAYABLE_PATTERNS)))
+NON_PLAYABLE_TITLE_RE = re.compile('|'.join(map(re.escape, NON_PLAYABLE_TITLES)))
+
+
+@lru_cache(maxsize=4096)
+def _is_playable(url: str, title: str) -> bool:
+    """同一分类链接和导航标题会在多个页面反复出现，判断结果按 (url, title) 缓存"""
+    if not url or not title:
+        return False
+    
+    if PLAYABLE_RE.search(url):
+        return True
+    
+    if NON_PLAYABLE_RE.search(url):
+        return False
+    
+    return not NON_PLAYABLE_TITLE_RE.search(title)
+
+
 class FinalWorkingGirigiriloveSource(SelectorMediaSource):
     """
     最终可工作的girigirilove数据源
@@ -77,104 +131,65 @@ class FinalWorkingGirigiriloveSource(SelectorMediaSource):
         判断是否是真正的播放URL
         过滤掉分类页面和无效链接
         """
-        if not url or not title:
-            return False
-        
-        # 播放URL的特征
-        playable_patterns = [
-            '/GV',          # GV开头的动漫页面
-            '/play/',       # 播放页面
-            '/watch/',      # 观看页面
-            '/video/',      # 视频页面
-        ]
-        
-        for pattern in playable_patterns:
-            if pattern in url:
-                return True
-        
-        # 排除明显的非播放链接
-        non_playable_patterns = [
-            '/show/2-----------',  # 分类页面
-            '/show/21-----------', # 剧场版分类
-            '/label/',             # 标签页
-            'javascript:',         # JS链接
-            '#',                   # 锚点
-        ]
-        
-        for pattern in non_playable_patterns:
-            if pattern in url:
-                return False
-        
-        # 排除导航标题
-        non_playable_titles = [
-            '日番', '劇場版', '点击广告', '游戏', 
-            '发布页', '联萌', '排行榜', '留言板',
-            '更多', '专题'
-        ]
-        
-        for invalid_title in non_playable_titles:
-            if invalid_title in title.strip():
-                return False
-        
-        return True
+        return _is_playable(url, title)
     
     async def search(self, search_config, query):
         """优化的搜索方法，专注获取播放链接"""
         # URL编码
         encoded_keyword = quote(query.subject_name)
-        original_url = search_config.search_url
-        search_config.search_url = original_url.replace('{keyword}', encoded_keyword)
+        search_config = replace(
+            search_config,
+            search_url=search_config.build_search_url(encoded_keyword)
+        )
         
         logger.info(f"最终搜索URL: {search_config.search_url}")
         
-        try:
-            # 调用父类搜索
-            results = await super().search(search_config, query)
-            
-            # 过滤出真正的播放链接
-            playable_results = []
-            for media in results:
-                url = media.download.url if media.download else ""
-                title = media.original_title
-                
-                if self._is_playable_url(url, title):
-                    playable_results.append(media)
-                    logger.debug(f"播放链接: {title} -> {url}")
-                else:
-                    logger.debug(f"过滤: {title} -> {url}")
-            
-            logger.info(f"播放链接数量: {len(playable_results)}/{len(results)}")
+        # 调用父类搜索
+        results = await super().search(search_config, query)
+        
+        # 过滤出真正的播放链接，保留已读取的标题供后面的匹配复用
+        playable = []
+        for media in results:
+            url = media.download.url if media.download else ""
+            title = media.original_title
             
-            # 如果搜索特定动漫，进一步匹配
-            if query.subject_name and playable_results:
-                matched_results = []
-                query_keywords = query.subject_name.split()
-                
-                for media in playable_results:
-                    title = media.original_title
-                    # 检查标题是否包含查询关键词
-                    if any(keyword in title for keyword in query_keywords):
-                        matched_results.append(media)
-                
-                if matched_results:
-                    logger.success(f"匹配 '{query.subject_name}': {len(matched_results)} 个")
-                    return matched_results
-                else:
-                    logger.info(f"未找到精确匹配，返回所有播放链接")
+            if self._is_playable_url(url, title):
+                playable.append((media, title))
+                logger.debug("播放链接: {} -> {}", title, url)
+            else:
+                logger.debug("过滤: {} -> {}", title, url)
+        
+        playable_results = [media for media, _ in playable]
+        logger.info(f"播放链接数量: {len(playable_results)}/{len(results)}")
+        
+        # 如果搜索特定动漫，进一步匹配
+        query_keywords = query.subject_name.split()
+        if query_keywords and playable:
+            # 所有关键词合并为一个正则，每个标题只扫描一次
+            keyword_re = re.compile('|'.join(map(re.escape, query_keywords)))
             
-            return playable_results
+            # 检查标题是否包含查询关键词
+            matched_results = [
+                media for media, title in playable
+                if keyword_re.search(title)
+            ]
             
-        finally:
-            search_config.search_url = original_url
+            if matched_results:
+                logger.success(f"匹配 '{query.subject_name}': {len(matched_results)} 个")
+                return matched_results
+            else:
+                logger.info(f"未找到精确匹配，返回所有播放链接")
+        
+        return playable_results
 
 
-def test_final_working_config():
+def test_final_working_config(session=None):
     """测试最终可工作的配置"""
     logger.info("🎯 测试最终可工作配置")
     logger.info("=" * 60)
     
     config = create_final_working_config()
-    source = FinalWorkingGirigiriloveSource("girigirilove-final", config)
+    source = FinalWorkingGirigiriloveSource("girigirilove-final", config, session=session)
     
     # 测试不同类型的查询
     test_queries = [
@@ -194,39 +209,30 @@ def test_final_working_config():
     
     successful_queries = 0
     
-    for query in test_queries:
+    for query, matches in iter_queries_concurrently(source, test_queries, MAX_CONCURRENT_QUERIES):
         logger.info(f"\n=== 测试: '{query}' ===")
         
-        request = MediaFetchRequest(
-            subject_names=[query] if query else [""],
-            episode_sort=EpisodeSort(1)
-        )
-        
-        try:
-            matches = list(source.fetch(request))
+        if isinstance(matches, Exception):
+            logger.error(f"测试 '{query}' 时出错: {matches}")
+        elif matches:
+            logger.success(f"✅ 找到 {len(matches)} 个播放链接:")
+            for i, match in enumerate(matches[:5]):
+                title = match.media.original_title
+                url = match.media.download.url if match.media.download else ""
+                logger.info(f"  {i+1}. {title}")
+                logger.info(f"     播放URL: {url}")
             
-            if matches:
-                logger.success(f"✅ 找到 {len(matches)} 个播放链接:")
-                for i, match in enumerate(matches[:5]):
-                    title = match.media.original_title
-                    url = match.media.download.url if match.media.download else ""
-                    logger.info(f"  {i+1}. {title}")
-                    logger.info(f"     播放URL: {url}")
-                
-                successful_queries += 1
-                
-                # 如果找到具体播放链接（包含GV的），就是真正成功
-                gv_links = [m for m in matches if '/GV' in (m.media.download.url if m.media.download else "")]
-                if gv_links:
-                    logger.success(f"🎉 找到 {len(gv_links)} 个GV播放链接!")
-                    logger.info("这些是可以进一步解析的动漫页面")
-                    return True
-                    
-            else:
-                logger.warning(f"未找到 '{query}' 的播放链接")
+            successful_queries += 1
+            
+            # 如果找到具体播放链接（包含GV的），就是真正成功
+            gv_links = [m for m in matches if '/GV' in (m.media.download.url if m.media.download else "")]
+            if gv_links:
+                logger.success(f"🎉 找到 {len(gv_links)} 个GV播放链接!")
+                logger.info("这些是可以进一步解析的动漫页面")
+                return True
                 
-        except Exception as e:
-            logger.error(f"测试 '{query}' 时出错: {e}")
+        else:
+            logger.warning(f"未找到 '{query}' 的播放链接")
     
     if successful_queries > 0:
         logger.success(f"✅ 测试成功! {successful_queries}/{len(test_queries)} 个查询有结果")
@@ -265,8 +271,9 @@ def main():
     logger.info("目标: 获取可工作的播放URL配置")
     logger.info("=" * 60)
     
-    # 测试最终配置
-    success = test_final_working_config()
+    # 测试最终配置，所有查询共用同一个会话
+    with create_shared_session() as session:
+        success = test_final_working_config(session)
     
     # 分析下一步工作
     analyze_next_steps()
@@ -9,52 +9,116 @@ import os
 import requests
 from bs4 import BeautifulSoup
 import re
+from collections import Counter
 
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+from web_scraper.core import compile_selector
 from web_scraper.utils.logger import logger
 
+# 使用已知可工作的URL
+SEARCH_TEST_URL = "https://anime.girigirilove.com/search/-------------/?wd=进击的巨人"
 
-def analyze_search_page_html():
+HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/128.0.0.0 Safari/537.36',
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
+    'Accept-Language': 'zh-CN,zh;q=0.9,en;q=0.8',
+    'Accept-Encoding': 'gzip, deflate, br',
+    'Connection': 'keep-alive',
+    'Upgrade-Insecure-Requests': '1'
+}
+
+# 可能的动漫链接特征
+ANIME_LINK_SELECTOR = 'a[href*="/show/"], a[href*="/v/"], a[href*="/anime/"], a[href*="/detail/"]'
+
+
+def cached_text(text_cache, elem):
+    """同一元素在一次分析中只提取一次文本，避免重复遍历子树"""
+    key = id(elem)
+    text = text_cache.get(key)
+    if text is None:
+        text = text_cache[key] = elem.get_text(strip=True)
+    return text
+
+
+# 已成功解析的页面: url -> (状态码, 内容长度, soup)
+_parsed_pages = {}
+
+
+def fetch_and_parse(url):
+    """
+    请求并解析页面，同一URL在一次运行中只下载和解析一次
+    返回 (状态码, 内容长度, soup)，非200响应时 soup 为 None
+    只缓存200响应，失败的请求下次调用会重新获取
+    搜索页面内容会变化，需要重新获取时调用 _parsed_pages.clear()
+    """
+    cached = _parsed_pages.get(url)
+    if cached is not None:
+        return cached
+    
+    response = requests.get(url, headers=HEADERS, timeout=15)
+    if response.status_code != 200:
+        return response.status_code, len(response.text), None
+    
+    result = _parsed_pages[url] = (response.status_code, len(response.text),
+                                   BeautifulSoup(response.text, 'lxml'))
+    return result
+
+
+def analyze_search_page_html(test_url=SEARCH_TEST_URL):
     """深度分析搜索页面的HTML结构"""
     logger.info("🔍 深度分析搜索页面HTML结构")
     logger.info("=" * 60)
     
-    # 使用已知可工作的URL
-    test_url = "https://anime.girigirilove.com/search/-------------/?wd=进击的巨人"
-    
-    headers = {
-        'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/128.0.0.0 Safari/537.36',
-        'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
-        'Accept-Language': 'zh-CN,zh;q=0.9,en;q=0.8',
-        'Accept-Encoding': 'gzip, deflate, br',
-        'Connection': 'keep-alive',
-        'Upgrade-Insecure-Requests': '1'
-    }
-    
     try:
         logger.info(f"请求URL: {test_url}")
-        response = requests.get(test_url, headers=headers, timeout=15)
-        logger.info(f"响应状态码: {response.status_code}")
-        logger.info(f"响应内容长度: {len(response.text)} 字符")
+        status_code, content_length, soup = fetch_and_parse(test_url)
+        logger.info(f"响应状态码: {status_code}")
+        logger.info(f"响应内容长度: {content_length} 字符")
         
-        if response.status_code != 200:
+        if soup is None:
             logger.error("页面访问失败")
             return
         
-        soup = BeautifulSoup(response.text, 'html.parser')
+        text_cache = {}
         
         # 1. 查找所有可能的列表容器
         logger.info("\n=== 1. 分析页面结构 ===")
         
-        # 查找常见的列表/容器元素
+        # 一次遍历DOM，同时收集常见的列表/容器元素和所有CSS类名
         containers = {
-            'ul elements': soup.find_all('ul'),
-            'div with class containing "list"': soup.find_all('div', class_=lambda x: x and 'list' in ' '.join(x).lower() if x else False),
-            'div with class containing "mac"': soup.find_all('div', class_=lambda x: x and 'mac' in ' '.join(x).lower() if x else False),
-            'div with class containing "item"': soup.find_all('div', class_=lambda x: x and 'item' in ' '.join(x).lower() if x else False),
-            'div with class containing "card"': soup.find_all('div', class_=lambda x: x and 'card' in ' '.join(x).lower() if x else False),
-            'li elements': soup.find_all('li'),
+            'ul elements': [],
+            'div with class containing "list"': [],
+            'div with class containing "mac"': [],
+            'div with class containing "item"': [],
+            'div with class containing "card"': [],
+            'li elements': [],
         }
+        div_buckets = [
+            (keyword, containers[f'div with class containing "{keyword}"'])
+            for keyword in ('list', 'mac', 'item', 'card')
+        ]
+        class_counts = Counter()
+        anime_link_css = compile_selector(ANIME_LINK_SELECTOR)
+        link_count = 0
+        anime_links = []
+        
+        for elem in soup.find_all(True):
+            classes = elem.get('class') or ()
+            class_counts.update(classes)
+            
+            if elem.name == 'ul':
+                containers['ul elements'].append(elem)
+            elif elem.name == 'li':
+                containers['li elements'].append(elem)
+            elif elem.name == 'a':
+                link_count += 1
+                if anime_link_css.match(elem):
+                    anime_links.append((elem['href'], cached_text(text_cache, elem)))
+            elif elem.name == 'div' and classes:
+                joined = ' '.join(classes).lower()
+                for keyword, bucket in div_buckets:
+                    if keyword in joined:
+                        bucket.append(elem)
         
         for container_type, elements in containers.items():
             if elements:
@@ -64,33 +128,22 @@ def analyze_search_page_html():
                     logger.info(f"  {i+1}. class: {classes}")
                     
                     # 显示元素的前100个字符的文本内容
-                    text = elem.get_text(strip=True)
+                    text = cached_text(text_cache, elem)
                     if text:
                         logger.info(f"     text: {text[:100]}...")
                     
                     # 查找内部的链接
-                    links = elem.find_all('a', limit=3)
+                    links = elem.find_all('a')
                     if links:
-                        logger.info(f"     包含 {len(elem.find_all('a'))} 个链接:")
-                        for j, link in enumerate(links):
+                        logger.info(f"     包含 {len(links)} 个链接:")
+                        for j, link in enumerate(links[:3]):
                             href = link.get('href', '')
-                            link_text = link.get_text(strip=True)
+                            link_text = cached_text(text_cache, link)
                             logger.info(f"       链接{j+1}: {href} - {link_text[:30]}")
         
         # 2. 查找所有链接
         logger.info("\n=== 2. 分析所有链接 ===")
-        all_links = soup.find_all('a')
-        logger.info(f"页面总计 {len(all_links)} 个链接")
-        
-        # 分类链接
-        anime_links = []
-        for link in all_links:
-            href = link.get('href', '')
-            text = link.get_text(strip=True)
-            
-            # 寻找可能的动漫链接
-            if href and any(pattern in href for pattern in ['/show/', '/v/', '/anime/', '/detail/']):
-                anime_links.append((href, text))
+        logger.info(f"页面总计 {link_count} 个链接")
         
         if anime_links:
             logger.success(f"找到 {len(anime_links)} 个可能的动漫链接:")
@@ -99,20 +152,14 @@ def analyze_search_page_html():
         
         # 3. 分析页面中的类名
         logger.info("\n=== 3. 分析所有CSS类名 ===")
-        all_classes = set()
-        for elem in soup.find_all(class_=True):
-            classes = elem.get('class', [])
-            all_classes.update(classes)
-        
         # 过滤出可能相关的类名
-        relevant_classes = [cls for cls in all_classes if any(keyword in cls.lower() for keyword in 
+        relevant_classes = [cls for cls in class_counts if any(keyword in cls.lower() for keyword in 
                            ['list', 'item', 'card', 'title', 'name', 'anime', 'show', 'video', 'mac'])]
         
         if relevant_classes:
             logger.info("找到相关的CSS类名:")
             for cls in sorted(relevant_classes):
-                elements_with_class = soup.find_all(class_=cls)
-                logger.info(f"  .{cls} ({len(elements_with_class)} 个元素)")
+                logger.info(f"  .{cls} ({class_counts[cls]} 个元素)")
         
         # 4. 生成推荐的选择器
         logger.info("\n=== 4. 推荐的选择器配置 ===")
@@ -150,7 +197,7 @@ def analyze_search_page_html():
         logger.info("\n=== 5. 页面HTML片段 (用于手动分析) ===")
         
         # 寻找最有可能包含搜索结果的部分
-        main_content = soup.find('main') or soup.find('div', class_=lambda x: x and 'main' in ' '.join(x).lower() if x else False)
+        main_content = soup.find('main') or soup.select_one('div[class*="main" i]')
         if main_content:
             logger.info("找到主要内容区域，HTML片段:")
             logger.info("```html")
@@ -181,50 +228,66 @@ def test_selector_candidates(soup):
         (".search-result", ".title", "a"),
         (".anime-item", ".name", "a"),
         
-        # 更通用的选择器
-        ("li", "a", "a"),
-        (".item", "a", "a"),  
+        # 更通用的选择器，最宽泛的放在最后
         ("article", "h2 a", "h2 a"),
         (".card", ".title a", ".title a"),
+        (".item", "a", "a"),
+        ("li", "a", "a"),
     ]
     
-    for i, (container_sel, title_sel, url_sel) in enumerate(selector_candidates):
+    # 候选选择器只编译一次，多个页面重复评估时复用同一个匹配器
+    compiled_candidates = [
+        (container_sel, title_sel, url_sel,
+         compile_selector(container_sel), compile_selector(title_sel), compile_selector(url_sel))
+        for container_sel, title_sel, url_sel in selector_candidates
+    ]
+    
+    # 不同候选组合常会选中同一个标题元素，文本只提取一次
+    text_cache = {}
+    
+    for i, (container_sel, title_sel, url_sel, container_css, title_css, url_css) in enumerate(compiled_candidates):
         logger.info(f"\n测试选择器组合 {i+1}:")
         logger.info(f"  容器: {container_sel}")
         logger.info(f"  标题: {title_sel}")
         logger.info(f"  链接: {url_sel}")
         
         try:
-            containers = soup.select(container_sel)
+            containers = container_css.select(soup)
             logger.info(f"  找到容器: {len(containers)} 个")
             
-            if containers:
-                # 测试前几个容器
-                valid_results = 0
-                for j, container in enumerate(containers[:5]):
-                    title_elem = container.select_one(title_sel)
-                    url_elem = container.select_one(url_sel)
-                    
-                    if title_elem and url_elem:
-                        title_text = title_elem.get_text(strip=True)
-                        url_href = url_elem.get('href', '')
-                        
-                        if title_text and url_href:
-                            valid_results += 1
-                            logger.info(f"    结果{j+1}: {title_text[:30]} -> {url_href}")
+            if not containers:
+                continue
+            
+            # 测试前几个容器
+            valid_results = 0
+            for j, container in enumerate(containers[:5]):
+                title_elem = title_css.select_one(container)
+                if not title_elem:
+                    continue
                 
-                if valid_results > 0:
-                    logger.success(f"  ✓ 此选择器组合有效! 找到 {valid_results} 个有效结果")
-                    logger.info("  建议使用此选择器配置")
+                # 标题和链接选择器相同时直接复用已找到的元素
+                url_elem = title_elem if url_sel == title_sel else url_css.select_one(container)
+                
+                if url_elem:
+                    title_text = cached_text(text_cache, title_elem)
+                    url_href = url_elem.get('href', '')
                     
-                    return {
-                        'subject_selector': container_sel,
-                        'name_selector': title_sel,
-                        'url_selector': url_sel,
-                        'valid_results': valid_results
-                    }
-                else:
-                    logger.warning("  ✗ 此选择器无有效结果")
+                    if title_text and url_href:
+                        valid_results += 1
+                        logger.info(f"    结果{j+1}: {title_text[:30]} -> {url_href}")
+            
+            if valid_results > 0:
+                logger.success(f"  ✓ 此选择器组合有效! 找到 {valid_results} 个有效结果")
+                logger.info("  建议使用此选择器配置")
+                
+                return {
+                    'subject_selector': container_sel,
+                    'name_selector': title_sel,
+                    'url_selector': url_sel,
+                    'valid_results': valid_results
+                }
+            else:
+                logger.warning("  ✗ 此选择器无有效结果")
         
         except Exception as e:
             logger.error(f"  ✗ 选择器错误: {e}")
@@ -6,16 +6,70 @@ girigirilove 优化配置
 
 import sys
 import os
+import re
+from dataclasses import replace
+from functools import lru_cache
 from urllib.parse import quote
 
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 
 from web_scraper.core import SelectorMediaSource
 from web_scraper.models import (
-    SelectorSearchConfig, MediaFetchRequest, EpisodeSort,
-    SelectorSubjectFormatConfig, SelectorChannelFormatConfig, MatchVideoConfig
+    SelectorSearchConfig, SelectorSubjectFormatConfig,
+    SelectorChannelFormatConfig, MatchVideoConfig
 )
 from web_scraper.utils.logger import logger
+from web_scraper.utils.concurrency import iter_queries_concurrently
+from web_scraper.utils.session import create_shared_session
+
+# 并发测试查询数上限，请求间隔仍由数据源自身的限流保证
+MAX_CONCURRENT_QUERIES = 4
+
+# 明显的非动漫链接，不区分大小写
+INVALID_LINK_PATTERNS = (
+    'label/',           # 标签页
+    'syogames.com',     # 游戏网站
+    'girigirilove.top', # 其他网站
+    'javascript:',      # JS链接
+    '#',                # 锚点链接
+)
+
+# 明显的导航标题
+INVALID_LINK_TITLES = frozenset((
+    '点击广告',
+    '游戏',
+    '发布页',
+    '联萌',
+    '日番',
+    '劇場版',
+))
+
+# 看起来像动漫的链接
+VALID_LINK_PATTERNS = (
+    '/GV',      # GV开头的ID
+    '/show/',   # show页面
+)
+
+INVALID_LINK_RE = re.compile('|'.join(map(re.escape, INVALID_LINK_PATTERNS)), re.IGNORECASE)
+VALID_LINK_RE = re.compile('|'.join(map(re.escape, VALID_LINK_PATTERNS)))
+
+
+@lru_cache(maxsize=4096)
+def _is_valid_anime_link(url: str, title: str) -> bool:
+    """海报和标题常指向同一链接，判断结果按 (url, title) 缓存"""
+    if not url or not title:
+        return False
+    
+    # 过滤掉明显的非动漫链接
+    if INVALID_LINK_RE.search(url):
+        return False
+    
+    # 过滤掉明显的导航标题
+    if title.strip() in INVALID_LINK_TITLES:
+        return False
+    
+    # 优先保留看起来像动漫的链接
+    return bool(VALID_LINK_RE.search(url))
 
 
 def create_optimized_config():
@@ -71,14 +125,11 @@ def create_filtered_config():
     """
     创建过滤版本的配置
     过滤掉非动漫相关的链接
+    
+    只替换选择器，其余设置（包括已编译的视频匹配配置）与优化配置共用
     """
-    return SelectorSearchConfig(
-        search_url="https://anime.girigirilove.com/search/-------------/?wd={keyword}",
-        
-        search_use_only_first_word=False,
-        search_remove_special=False,
-        search_use_subject_names_count=2,
-        request_interval_seconds=2.0,
+    return replace(
+        create_optimized_config(),
         
         # 更精确的选择器，尝试过滤出真正的搜索结果
         subject_format_config=SelectorSubjectFormatConfig(
@@ -93,15 +144,6 @@ def create_filtered_config():
             name_selector="a, .title",
             url_selector="a"
         ),
-        
-        match_video=MatchVideoConfig(
-            enable_nested_url=True,
-            match_video_url=r"(\.mp4|\.m3u8|/play/|/video/|stream|watch|/GV\d+/)",
-            cookies="",
-        ),
-        
-        default_resolution="1080P",
-        default_subtitle_language="CHS"
     )
 
 
@@ -119,79 +161,31 @@ class OptimizedGirigiriloveSource(SelectorMediaSource):
         验证是否是有效的动漫链接
         过滤掉导航链接、广告链接等
         """
-        if not url or not title:
-            return False
-            
-        # 过滤掉明显的非动漫链接
-        invalid_patterns = [
-            'label/',           # 标签页
-            'syogames.com',     # 游戏网站
-            'girigirilove.top', # 其他网站
-            'javascript:',      # JS链接
-            '#',               # 锚点链接
-        ]
-        
-        for pattern in invalid_patterns:
-            if pattern in url.lower():
-                return False
-        
-        # 过滤掉明显的导航标题
-        invalid_titles = [
-            '点击广告',
-            '游戏',
-            '发布页',
-            '联萌',
-            '日番',
-            '劇場版',
-        ]
-        
-        for invalid_title in invalid_titles:
-            if title.strip() == invalid_title:
-                return False
-        
-        # 优先保留看起来像动漫的链接
-        valid_patterns = [
-            '/GV',      # GV开头的ID
-            '/show/',   # show页面
-        ]
-        
-        for pattern in valid_patterns:
-            if pattern in url:
-                return True
-                
-        return False
+        return _is_valid_anime_link(url, title)
     
     async def search(self, search_config, query):
         """覆盖搜索方法添加结果过滤"""
         # URL编码
         encoded_keyword = quote(query.subject_name)
-        original_url = search_config.search_url
-        search_config.search_url = original_url.replace('{keyword}', encoded_keyword)
+        search_config = replace(
+            search_config,
+            search_url=search_config.build_search_url(encoded_keyword)
+        )
         
         logger.info(f"搜索URL: {search_config.search_url}")
         
-        try:
-            # 调用父类搜索
-            results = await super().search(search_config, query)
-            
-            # 过滤结果
-            filtered_results = []
-            for media in results:
-                url = media.download.url if media.download else ""
-                title = media.original_title
-                
-                if self._is_valid_anime_link(url, title):
-                    filtered_results.append(media)
-                    logger.debug(f"保留结果: {title} -> {url}")
-                else:
-                    logger.debug(f"过滤掉: {title} -> {url}")
-            
-            logger.info(f"过滤后结果: {len(filtered_results)}/{len(results)}")
-            return filtered_results
-            
-        finally:
-            # 恢复原始URL
-            search_config.search_url = original_url
+        # 调用父类搜索
+        results = await super().search(search_config, query)
+        
+        # 过滤结果，只输出汇总日志
+        is_valid = self._is_valid_anime_link
+        filtered_results = [
+            media for media in results
+            if is_valid(media.download.url if media.download else "", media.original_title)
+        ]
+        
+        logger.info(f"过滤后结果: {len(filtered_results)}/{len(results)}")
+        return filtered_results
 
 
 def test_optimized_config():
@@ -199,19 +193,21 @@ def test_optimized_config():
     logger.info("🎯 测试优化的girigirilove配置")
     logger.info("=" * 60)
     
-    # 测试基本配置
-    logger.info("\n=== 测试基本优化配置 ===")
-    config = create_optimized_config()
-    source = OptimizedGirigiriloveSource("girigirilove-optimized", config)
-    
-    test_search_functionality(source, "基本优化配置")
-    
-    # 测试过滤配置
-    logger.info("\n=== 测试过滤配置 ===")
-    filtered_config = create_filtered_config()
-    filtered_source = OptimizedGirigiriloveSource("girigirilove-filtered", filtered_config)
-    
-    test_search_functionality(filtered_source, "过滤配置")
+    # 两个配置共用同一个会话，避免重复握手
+    with create_shared_session() as session:
+        # 测试基本配置
+        logger.info("\n=== 测试基本优化配置 ===")
+        config = create_optimized_config()
+        source = OptimizedGirigiriloveSource("girigirilove-optimized", config, session=session)
+        
+        test_search_functionality(source, "基本优化配置")
+        
+        # 测试过滤配置
+        logger.info("\n=== 测试过滤配置 ===")
+        filtered_config = create_filtered_config()
+        filtered_source = OptimizedGirigiriloveSource("girigirilove-filtered", filtered_config, session=session)
+        
+        test_search_functionality(filtered_source, "过滤配置")
 
 
 def test_search_functionality(source, config_name):
@@ -226,34 +222,26 @@ def test_search_functionality(source, config_name):
         "火影忍者"
     ]
     
-    for query in test_queries:
+    # 任一查询有结果即结束测试（未开始的查询会被取消，进行中的查询会先收尾）
+    for query, matches in iter_queries_concurrently(source, test_queries, MAX_CONCURRENT_QUERIES):
         logger.info(f"\n--- 搜索: {query} ---")
         
-        request = MediaFetchRequest(
-            subject_names=[query],
-            episode_sort=EpisodeSort(1)
-        )
-        
-        try:
-            matches = list(source.fetch(request))
+        if isinstance(matches, Exception):
+            logger.error(f"搜索 '{query}' 时出错: {matches}")
+        elif matches:
+            logger.success(f"✓ 找到 {len(matches)} 个结果:")
+            for i, match in enumerate(matches[:5]):  # 显示前5个
+                title = match.media.original_title
+                url = match.media.download.url if match.media.download else ""
+                logger.info(f"  {i+1}. {title}")
+                logger.info(f"     URL: {url}")
+            
+            # 如果找到结果就停止测试
+            logger.success(f"✅ {config_name} 配置工作正常!")
+            return True
             
-            if matches:
-                logger.success(f"✓ 找到 {len(matches)} 个结果:")
-                for i, match in enumerate(matches[:5]):  # 显示前5个
-                    title = match.media.original_title
-                    url = match.media.download.url if match.media.download else ""
-                    logger.info(f"  {i+1}. {title}")
-                    logger.info(f"     URL: {url}")
-                
-                # 如果找到结果就停止测试
-                logger.success(f"✅ {config_name} 配置工作正常!")
-                return True
-                
-            else:
-                logger.warning(f"未找到 '{query}' 的搜索结果")
-                
-        except Exception as e:
-            logger.error(f"搜索 '{query}' 时出错: {e}")
+        else:
+            logger.warning(f"未找到 '{query}' 的搜索结果")
     
     logger.warning(f"❌ {config_name} 未找到有效结果")
     return False
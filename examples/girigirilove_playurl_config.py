@@ -6,6 +6,10 @@ girigirilove 播放URL获取配置
 
 import sys
 import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import replace
+from functools import lru_cache
 from urllib.parse import quote
 
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
@@ -17,6 +21,38 @@ from web_scraper.models import (
 )
 from web_scraper.utils.logger import logger
 
+# 播放URL的特征
+PLAY_URL_PATTERNS = (
+    '/GV',          # GV开头的动漫ID
+    '/play/',       # 播放页面
+    '/watch/',      # 观看页面
+    '/video/',      # 视频页面
+    '/episode/',    # 剧集页面
+)
+
+# 分类页面
+CATEGORY_PATTERNS = (
+    '/show/2-----------',  # 日番分类
+    '/show/21-----------', # 剧场版分类
+    '/label/',             # 标签页
+)
+
+PLAY_URL_RE = re.compile('|'.join(map(re.escape, PLAY_URL_PATTERNS)))
+CATEGORY_RE = re.compile('|'.join(map(re.escape, CATEGORY_PATTERNS)))
+
+
+@lru_cache(maxsize=4096)
+def _is_play_url(url: str) -> bool:
+    """同一页面中海报和标题常重复同一个链接，判断结果按URL缓存"""
+    if not url:
+        return False
+    
+    if PLAY_URL_RE.search(url):
+        return True
+    
+    # 排除分类页面
+    return not CATEGORY_RE.search(url)
+
 
 def create_playurl_config():
     """
@@ -94,67 +130,30 @@ class PlayUrlGirigiriloveSource(SelectorMediaSource):
         """
         判断是否是播放URL而不是分类页面
         """
-        if not url:
-            return False
-            
-        # 播放URL的特征
-        play_patterns = [
-            '/GV',          # GV开头的动漫ID
-            '/play/',       # 播放页面
-            '/watch/',      # 观看页面
-            '/video/',      # 视频页面
-            '/episode/',    # 剧集页面
-        ]
-        
-        for pattern in play_patterns:
-            if pattern in url:
-                return True
-        
-        # 排除分类页面
-        category_patterns = [
-            '/show/2-----------',  # 日番分类
-            '/show/21-----------', # 剧场版分类
-            '/label/',             # 标签页
-        ]
-        
-        for pattern in category_patterns:
-            if pattern in url:
-                return False
-                
-        return True
+        return _is_play_url(url)
     
     async def search(self, search_config, query):
         """覆盖搜索方法，确保URL格式正确"""
         # 构建正确的搜索URL
         correct_search_url = self._build_correct_search_url(query.subject_name)
         
-        # 临时替换配置中的URL
-        original_url = search_config.search_url
-        search_config.search_url = correct_search_url
+        # 使用替换了搜索URL的配置副本，不修改共享配置
+        search_config = replace(search_config, search_url=correct_search_url)
         
         logger.info(f"使用正确的搜索URL: {search_config.search_url}")
         
-        try:
-            # 调用父类搜索
-            results = await super().search(search_config, query)
-            
-            # 过滤出播放URL
-            play_results = []
-            for media in results:
-                url = media.download.url if media.download else ""
-                
-                if self._is_play_url(url):
-                    play_results.append(media)
-                    logger.debug(f"✓ 播放URL: {media.original_title} -> {url}")
-                else:
-                    logger.debug(f"✗ 跳过分类页面: {media.original_title} -> {url}")
-            
-            logger.info(f"找到播放URL: {len(play_results)}/{len(results)}")
-            return play_results
-            
-        finally:
-            # 恢复原始URL
-            search_config.search_url = original_url
+        # 调用父类搜索
+        results = await super().search(search_config, query)
+        
+        # 过滤出播放URL，只输出汇总日志
+        is_play_url = self._is_play_url
+        play_results = [
+            media for media in results
+            if is_play_url(media.download.url if media.download else "")
+        ]
+        
+        logger.info(f"找到播放URL: {len(play_results)}/{len(results)}")
+        return play_results
 
 
 def test_playurl_extraction():
@@ -247,39 +246,47 @@ def test_category_page():
         "https://anime.girigirilove.com/show/2-----------2024/",  # 2024年日番
     ]
     
-    for category_url in category_urls:
-        logger.info(f"\n访问分类页面: {category_url}")
+    import requests
+    from bs4 import BeautifulSoup
+    
+    headers = {
+        'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36'
+    }
+    
+    # 共用一个会话复用连接，所有分类页面同时下载，再按顺序检查
+    with requests.Session() as session, ThreadPoolExecutor(max_workers=len(category_urls)) as executor:
+        session.headers.update(headers)
+        futures = [
+            (category_url, executor.submit(session.get, category_url, timeout=15))
+            for category_url in category_urls
+        ]
         
-        try:
-            import requests
-            from bs4 import BeautifulSoup
-            
-            headers = {
-                'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36'
-            }
+        for category_url, future in futures:
+            logger.info(f"\n访问分类页面: {category_url}")
             
-            response = requests.get(category_url, headers=headers, timeout=15)
-            logger.info(f"响应状态: {response.status_code}")
-            
-            if response.status_code == 200:
-                soup = BeautifulSoup(response.text, 'html.parser')
-                
-                # 寻找具体的动漫链接
-                anime_links = soup.find_all('a', href=lambda x: x and '/GV' in x if x else False)
+            try:
+                response = future.result()
+                logger.info(f"响应状态: {response.status_code}")
                 
-                if anime_links:
-                    logger.success(f"找到 {len(anime_links)} 个动漫播放链接:")
-                    for i, link in enumerate(anime_links[:10]):  # 显示前10个
-                        href = link.get('href', '')
-                        text = link.get_text(strip=True)
-                        logger.info(f"  {i+1}. {text} -> {href}")
+                if response.status_code == 200:
+                    soup = BeautifulSoup(response.text, 'lxml')
                     
-                    return True
-                else:
-                    logger.warning("在分类页面中未找到播放链接")
-            
-        except Exception as e:
-            logger.error(f"访问分类页面时出错: {e}")
+                    # 寻找具体的动漫链接
+                    anime_links = soup.select('a[href*="/GV"]')
+                    
+                    if anime_links:
+                        logger.success(f"找到 {len(anime_links)} 个动漫播放链接:")
+                        for i, link in enumerate(anime_links[:10]):  # 显示前10个
+                            href = link.get('href', '')
+                            text = link.get_text(strip=True)
+                            logger.info(f"  {i+1}. {text} -> {href}")
+                        
+                        return True
+                    else:
+                        logger.warning("在分类页面中未找到播放链接")
+                
+            except Exception as e:
+                logger.error(f"访问分类页面时出错: {e}")
     
     return False
 
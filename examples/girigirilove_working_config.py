@@ -6,6 +6,7 @@ girigirilove 可工作配置
 
 import sys
 import os
+from dataclasses import replace
 from urllib.parse import quote
 
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
@@ -80,25 +81,22 @@ class GirigiriloveMediaSource(SelectorMediaSource):
         """对搜索关键词进行URL编码"""
         # URL编码中文字符
         encoded = quote(keyword, safe='')
-        logger.debug(f"关键词编码: {keyword} -> {encoded}")
+        logger.debug("关键词编码: {} -> {}", keyword, encoded)
         return encoded
     
     async def search(self, search_config, query):
         """覆盖搜索方法处理URL编码"""
-        original_url = search_config.search_url
-        
         # 对关键词进行URL编码
         encoded_keyword = self._encode_search_keyword(query.subject_name)
-        search_config.search_url = original_url.replace('{keyword}', encoded_keyword)
+        search_config = replace(
+            search_config,
+            search_url=search_config.build_search_url(encoded_keyword)
+        )
         
         logger.info(f"搜索URL: {search_config.search_url}")
         
-        try:
-            result = await super().search(search_config, query)
-            return result
-        finally:
-            # 恢复原始URL
-            search_config.search_url = original_url
+        result = await super().search(search_config, query)
+        return result
 
 
 def test_working_config():
@@ -129,7 +127,7 @@ def test_working_config():
         
         # 测试URL编码
         encoded = source._encode_search_keyword(query)
-        test_url = config.search_url.replace('{keyword}', encoded)
+        test_url = config.build_search_url(encoded)
         logger.info(f"测试URL: {test_url}")
         
         # 创建搜索请求
@@ -188,15 +186,15 @@ def debug_search_page():
         logger.info(f"响应状态码: {response.status_code}")
         
         if response.status_code == 200:
-            soup = BeautifulSoup(response.text, 'html.parser')
+            soup = BeautifulSoup(response.text, 'lxml')
             
             # 查找可能的搜索结果容器
             possible_containers = [
-                soup.find_all(class_=lambda x: x and 'mac-list' in x if x else False),
-                soup.find_all(class_=lambda x: x and 'list' in x if x else False),
-                soup.find_all(class_=lambda x: x and 'item' in x if x else False),
+                soup.select('[class*="mac-list"]'),
+                soup.select('[class*="list"]'),
+                soup.select('[class*="item"]'),
                 soup.find_all('li'),
-                soup.find_all(class_=lambda x: x and 'card' in x if x else False)
+                soup.select('[class*="card"]')
             ]
             
             for i, containers in enumerate(possible_containers):
@@ -207,15 +205,15 @@ def debug_search_page():
                         logger.info(f"  容器 {j+1}: {classes}")
                         
                         # 查找其中的链接和文本
-                        links = container.find_all('a')
+                        links = container.find_all('a', limit=2)
                         if links:
-                            for k, link in enumerate(links[:2]):
+                            for k, link in enumerate(links):
                                 href = link.get('href', '')
                                 text = link.get_text(strip=True)
                                 logger.info(f"    链接 {k+1}: {href} - {text[:30]}")
             
             # 查找标题相关元素
-            title_elements = soup.find_all(class_=lambda x: x and 'title' in ' '.join(x).lower() if x else False)
+            title_elements = soup.select('[class*="title" i]')
             if title_elements:
                 logger.info(f"找到 {len(title_elements)} 个标题元素:")
                 for i, elem in enumerate(title_elements[:3]):
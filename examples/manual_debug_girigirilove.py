@@ -6,13 +6,59 @@
 
 import sys
 import os
+import json
 import requests
-from bs4 import BeautifulSoup
-import time
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from bs4 import BeautifulSoup, SoupStrainer
+from concurrent.futures import ThreadPoolExecutor
+from itertools import groupby
+from lxml import etree, html
 
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+from web_scraper.core import HostRateLimiter
 from web_scraper.utils.logger import logger
 
+# 安装了 orjson 时用它直接解析字节形式的JSON响应，否则退回标准库 json
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:
+    _json_loads = json.loads
+
+# href 包含这些片段的链接可能是动漫链接
+ANIME_HREF_PARTS = ('anime', 'show', '/v/')
+
+# 主页上最多展示的搜索元素与动漫链接数量
+MAX_SEARCH_ELEMENTS = 3
+MAX_ANIME_LINKS = 5
+
+# 同时探测的搜索URL数量上限，避免对站点并发过多
+MAX_CONCURRENT_PROBES = 3
+
+# 探测时最多读取的响应体字节数，足够判断是JSON还是HTML
+PROBE_BODY_LIMIT = 64 * 1024
+
+# 探测到的搜索页直接用 lxml 解析，省去 BeautifulSoup 的包装开销。
+# 探测结果只在主线程中按顺序解析，因此共用一个解析器实例即可
+_PROBE_HTML_PARSER = html.HTMLParser(collect_ids=False, huge_tree=False)
+
+# 类名包含这些词的 div/li/article 可能是搜索结果容器
+RESULT_CONTAINER_TAGS = ('div', 'li', 'article')
+RESULT_CLASS_WORDS = ('item', 'card', 'result', 'anime', 'video')
+
+
+def find_result_containers(tree):
+    """找出类名包含结果关键词的容器，每个标签只转一次小写"""
+    containers = []
+    for tag in tree.iter(*RESULT_CONTAINER_TAGS):
+        classes = tag.get('class')
+        if not classes:
+            continue
+        if any(word in classes.lower() for word in RESULT_CLASS_WORDS):
+            containers.append((tag, classes.split()))
+    return containers
+
 
 def test_basic_access():
     """测试基本访问"""
@@ -31,6 +77,16 @@ def test_basic_access():
     session = requests.Session()
     session.headers.update(headers)
     
+    # 连接池足够容纳并发探测；限流和临时故障按指数退避重试
+    adapter = HTTPAdapter(
+        pool_connections=4,
+        pool_maxsize=16,
+        max_retries=Retry(total=3, backoff_factor=0.5, status_forcelist=[429, 502, 503, 504],
+                          raise_on_status=False),
+    )
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    
     try:
         logger.info("尝试访问主页...")
         response = session.get("https://anime.girigirilove.com/", timeout=15)
@@ -39,21 +95,31 @@ def test_basic_access():
         if response.status_code == 200:
             logger.success("主页访问成功！")
             
-            # 分析页面内容
-            soup = BeautifulSoup(response.text, 'html.parser')
+            # 分析页面内容，只需要搜索表单和链接，其余节点不建树
+            soup = BeautifulSoup(response.content, 'lxml', parse_only=SoupStrainer(['input', 'form', 'a']))
+            
+            # 一次遍历同时收集搜索元素和动漫链接，两者都找够即停止
+            search_elements, anime_links = [], []
+            for elem in soup.descendants:
+                if elem.name in ('input', 'form'):
+                    if (len(search_elements) < MAX_SEARCH_ELEMENTS
+                            and 'search' in ' '.join(elem.get('class') or ()).lower()):
+                        search_elements.append(elem)
+                elif elem.name == 'a':
+                    href = elem.get('href') or ''
+                    if len(anime_links) < MAX_ANIME_LINKS and any(part in href for part in ANIME_HREF_PARTS):
+                        anime_links.append(elem)
+                if len(search_elements) >= MAX_SEARCH_ELEMENTS and len(anime_links) >= MAX_ANIME_LINKS:
+                    break
             
-            # 查找搜索相关元素
-            search_elements = soup.find_all(['input', 'form'], class_=lambda x: x and 'search' in x.lower() if x else False)
             if search_elements:
                 logger.info("找到可能的搜索元素:")
-                for elem in search_elements[:3]:
+                for elem in search_elements:
                     logger.info(f"  {elem.name}: {elem.get('class', [])} - {elem.get('action', '')}")
             
-            # 查找可能的动漫链接
-            anime_links = soup.find_all('a', href=lambda x: x and ('anime' in x or 'show' in x or '/v/' in x) if x else False)
             if anime_links:
                 logger.info("找到可能的动漫链接:")
-                for link in anime_links[:5]:
+                for link in anime_links:
                     logger.info(f"  {link.get('href')} - {link.get_text(strip=True)[:30]}")
             
             return True, session
@@ -67,6 +133,12 @@ def test_basic_access():
         return False, None
 
 
+def _close_probe_response(future):
+    """关闭已完成探测的流式响应，释放其占用的连接"""
+    if not future.cancelled() and future.exception() is None:
+        future.result().close()
+
+
 def find_search_functionality(session):
     """寻找搜索功能"""
     logger.info("\n=== 寻找搜索功能 ===")
@@ -80,47 +152,78 @@ def find_search_functionality(session):
         "https://anime.girigirilove.com/search.php?keyword=test"
     ]
     
-    for pattern in search_patterns:
-        logger.info(f"尝试搜索URL: {pattern}")
+    # 按服务器返回的限流响应头节流，没有限流信息时自适应调整请求间隔；
+    # 429/503 的退避重试由 session 上挂载的 Retry 处理
+    rate_limiter = HostRateLimiter(adaptive=True)
+    
+    def probe(url):
+        rate_limiter.acquire(url)
+        response = session.get(url, timeout=10, stream=True)
+        rate_limiter.update_from(url, response)
+        return response
+    
+    # 所有候选URL并发请求（并发数受限），再按顺序检查结果
+    with ThreadPoolExecutor(max_workers=MAX_CONCURRENT_PROBES) as executor:
+        futures = [
+            (pattern, executor.submit(probe, pattern))
+            for pattern in search_patterns
+        ]
         
         try:
-            response = session.get(pattern, timeout=10)
-            logger.info(f"  状态码: {response.status_code}")
-            
-            if response.status_code == 200:
-                # 检查响应内容
-                content_type = response.headers.get('content-type', '')
-                if 'json' in content_type:
-                    logger.success("  发现JSON API接口！")
-                    try:
-                        data = response.json()
-                        logger.info(f"  JSON数据示例: {str(data)[:200]}")
-                    except:
-                        logger.info("  无法解析JSON数据")
-                else:
-                    logger.success("  发现HTML搜索页面！")
-                    soup = BeautifulSoup(response.text, 'html.parser')
-                    
-                    # 分析搜索结果结构
-                    possible_containers = soup.find_all(['div', 'li', 'article'], 
-                                                       class_=lambda x: x and any(word in x.lower() 
-                                                       for word in ['item', 'card', 'result', 'anime', 'video']) if x else False)
-                    
-                    if possible_containers:
-                        logger.info(f"  找到 {len(possible_containers)} 个可能的结果容器")
-                        for i, container in enumerate(possible_containers[:3]):
-                            classes = container.get('class', [])
-                            logger.info(f"    容器 {i+1}: {classes}")
-                return pattern
-            elif response.status_code == 404:
-                logger.warning("  页面不存在")
-            else:
-                logger.warning(f"  其他错误: {response.status_code}")
+            for pattern, future in futures:
+                logger.info(f"尝试搜索URL: {pattern}")
                 
-        except requests.exceptions.RequestException as e:
-            logger.error(f"  请求失败: {e}")
-        
-        time.sleep(1)  # 避免请求过快
+                try:
+                    response = future.result()
+                except requests.exceptions.RequestException as e:
+                    logger.error(f"  请求失败: {e}")
+                    continue
+                
+                # 流式请求：只在需要分析时读取有限长度的响应体，用完立即释放连接
+                with response:
+                    logger.info(f"  状态码: {response.status_code}")
+                    
+                    if response.status_code == 200:
+                        # 检查响应内容
+                        content_type = response.headers.get('content-type', '')
+                        try:
+                            body = response.raw.read(PROBE_BODY_LIMIT, decode_content=True)
+                        except Exception as e:
+                            logger.error(f"  读取响应失败: {e}")
+                            continue
+                        
+                        if 'json' in content_type:
+                            logger.success("  发现JSON API接口！")
+                            try:
+                                data = _json_loads(body)
+                                logger.info(f"  JSON数据示例: {str(data)[:200]}")
+                            except ValueError:
+                                logger.info("  无法解析JSON数据（可能超出读取长度）")
+                        else:
+                            logger.success("  发现HTML搜索页面！")
+                            try:
+                                tree = html.fromstring(body, parser=_PROBE_HTML_PARSER)
+                            except etree.ParserError as e:
+                                logger.warning(f"  无法解析页面: {e}")
+                                return pattern
+                            
+                            # 分析搜索结果结构
+                            possible_containers = find_result_containers(tree)
+                            
+                            if possible_containers:
+                                logger.info(f"  找到 {len(possible_containers)} 个可能的结果容器")
+                                for i, (_, classes) in enumerate(possible_containers[:3]):
+                                    logger.info(f"    容器 {i+1}: {classes}")
+                        return pattern
+                    elif response.status_code == 404:
+                        logger.warning("  页面不存在")
+                    else:
+                        logger.warning(f"  其他错误: {response.status_code}")
+        finally:
+            # 提前返回时也关闭其余探测的流式响应，避免连接一直被占用到垃圾回收
+            for _, future in futures:
+                if not future.cancel():
+                    future.add_done_callback(_close_probe_response)
     
     logger.warning("未找到可用的搜索接口")
     return None
@@ -152,15 +255,14 @@ def analyze_page_structure():
         "11. 根据分析结果修改配置文件"
     ]
     
-    for step in steps:
-        if step.startswith(('1.', '2.', '3.', '4.', '9.', '11.')):
-            logger.info(step)
-        elif step.startswith('5.'):
-            logger.warning(step)
-        elif step.startswith(('6.', '7.', '8.', '10.')):
-            logger.warning(step)
-        else:
-            logger.info(step)
+    def step_level(step):
+        if step.startswith(('5.', '6.', '7.', '8.', '10.')):
+            return "WARNING"
+        return "INFO"
+    
+    # 相邻同级别的步骤合并为一条日志输出，减少逐行记录的开销
+    for level, group in groupby(steps, key=step_level):
+        logger.log(level, '\n'.join(group))
 
 
 def create_debug_config_template():
@@ -190,8 +292,7 @@ config = SelectorSearchConfig(
 )
 '''
     
-    logger.info("配置模板:")
-    print(template)
+    logger.info(f"配置模板:{template}")
 
 
 def main():
@@ -5,6 +5,7 @@ Simple test runner for the Python web scraper implementation.
 
 import sys
 import os
+from concurrent.futures import ThreadPoolExecutor
 from web_scraper.utils.logger import logger
 
 # Add the web_scraper package to the Python path
@@ -154,12 +155,13 @@ def main():
         test_utilities,
     ]
     
-    passed = 0
-    total = len(tests)
+    # Tests are independent; run them concurrently so the network-bound
+    # connection check overlaps the others (log lines may interleave)
+    with ThreadPoolExecutor(max_workers=len(tests)) as executor:
+        results = list(executor.map(lambda test: test(), tests))
     
-    for test in tests:
-        if test():
-            passed += 1
+    passed = sum(results)
+    total = len(tests)
     
     logger.info(f"测试结果: {passed}/{total} 个测试通过")
     
@@ -0,0 +1,72 @@
+"""
+Tests for SelectorMediaSourceEngine selection
+"""
+
+import unittest
+
+from bs4 import BeautifulSoup
+
+from web_scraper.core import SelectorMediaSourceEngine
+from web_scraper.models import SelectorSearchConfig
+from web_scraper.models.config import SelectorSubjectFormatConfig, SelectorChannelFormatConfig
+
+
+def make_config(subject_selectors, episode_selectors):
+    subject_selector, subject_name, subject_url = subject_selectors
+    episode_selector, episode_name, episode_url = episode_selectors
+    return SelectorSearchConfig(
+        search_url="https://example.com/search?q={keyword}",
+        subject_format_config=SelectorSubjectFormatConfig(
+            subject_selector=subject_selector,
+            name_selector=subject_name,
+            url_selector=subject_url
+        ),
+        channel_format_config=SelectorChannelFormatConfig(
+            episode_selector=episode_selector,
+            name_selector=episode_name,
+            url_selector=episode_url
+        )
+    )
+
+
+class SelfMatchingSelectorTest(unittest.TestCase):
+    """Name/URL selectors may match the subject or episode element itself, as with PyQuery"""
+    
+    def setUp(self):
+        self.engine = SelectorMediaSourceEngine()
+    
+    def test_select_episodes_with_self_matching_selectors(self):
+        page = BeautifulSoup('<ul><li><a href="/play/1">第1集</a></li></ul>', 'lxml')
+        config = make_config((".item", ".title", "a"), ("a", "a", "a"))
+        
+        episodes = self.engine.select_episodes(page, "https://example.com/anime/1", config)
+        
+        self.assertEqual(len(episodes), 1)
+        self.assertEqual(episodes[0].name, "第1集")
+        self.assertEqual(episodes[0].play_url, "https://example.com/play/1")
+    
+    def test_select_subjects_with_self_matching_name_selector(self):
+        page = BeautifulSoup(
+            '<div><a class="vod-title" href="/GV1">进击的巨人</a></div>', 'lxml'
+        )
+        config = make_config((".vod-title", ".vod-title", "a"), ("a", "a", "a"))
+        
+        subjects = self.engine.select_subjects(page, config)
+        
+        self.assertEqual(len(subjects), 1)
+        self.assertEqual(subjects[0].name, "进击的巨人")
+        self.assertEqual(subjects[0].full_url, "https://example.com/GV1")
+    
+    def test_descendant_selectors_still_match(self):
+        page = BeautifulSoup(
+            '<div class="item"><h3 class="title">海贼王</h3><a href="/GV2">x</a></div>', 'lxml'
+        )
+        config = make_config((".item", ".title", "a"), ("a", "a", "a"))
+        
+        subjects = self.engine.select_subjects(page, config)
+        
+        self.assertEqual([s.name for s in subjects], ["海贼王"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,3 +1,5 @@
 from .engine import SelectorMediaSourceEngine
+from .rate_limit import HostRateLimiter
+from .selectors import compile_selector
 from .source import SelectorMediaSource
 from .three_step_source import ThreeStepWebMediaSource
\ No newline at end of file
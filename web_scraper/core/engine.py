@@ -13,8 +13,10 @@ from typing import List, Optional, Dict, Any, Sequence
 from urllib.parse import urljoin, urlparse, quote_plus
 import requests
 from bs4 import BeautifulSoup, Tag
-from pyquery import PyQuery as pq
+import soupsieve
 from ..utils.logger import logger
+from .rate_limit import HostRateLimiter
+from .selectors import compile_selector
 
 from ..models import (
     WebSearchSubjectInfo, WebSearchEpisodeInfo, SelectorSearchQuery,
@@ -38,6 +40,7 @@ class SelectorMediaSourceEngine:
     
     CURRENT_VERSION = 1
     DEFAULT_SUBTITLE_LANGUAGES = ["CHS"]
+    MAX_RETRIES = 3
     
     def __init__(self, session: Optional[requests.Session] = None):
         self.session = session or requests.Session()
@@ -45,6 +48,41 @@ class SelectorMediaSourceEngine:
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
         })
         self._last_search_time = 0.0
+        self.rate_limiter = HostRateLimiter()
+    
+    def _get(self, url: str) -> requests.Response:
+        """
+        GET throttled per host, with rate-limit bookkeeping and exponential
+        back-off on 429/503. Every request (search, detail and episode pages)
+        goes through the limiter, so concurrent crawls share the host budget.
+        """
+        for attempt in range(self.MAX_RETRIES):
+            self.rate_limiter.acquire(url)
+            response = self.session.get(url)
+            self.rate_limiter.update_from(url, response)
+            if (response.status_code not in HostRateLimiter.RETRY_STATUS_CODES
+                    or attempt == self.MAX_RETRIES - 1):
+                return response
+            
+            # The back-off pushes the host's next slot out; acquire() waits for it
+            wait_time = self.rate_limiter.backoff(url, attempt)
+            logger.warning(f"请求被限流 ({response.status_code})，{wait_time:.1f} 秒后重试: {url}")
+        return response
+    
+    @staticmethod
+    def _element_text(element: Tag) -> str:
+        """Element text with whitespace collapsed, as PyQuery.text() returned it"""
+        return " ".join(element.get_text(" ").split())
+    
+    @staticmethod
+    def _select_in(selector: soupsieve.SoupSieve, element: Tag) -> Optional[Tag]:
+        """
+        First match for the selector in the element, including the element itself.
+        
+        PyQuery searched descendant-or-self, so a selector may target the
+        subject/episode element directly (e.g. an episode config of "a"/"a"/"a").
+        """
+        return element if selector.match(element) else selector.select_one(element)
     
     def _encode_url_segment(self, text: str) -> str:
         """URL encode a text segment"""
@@ -86,12 +124,12 @@ class SelectorMediaSourceEngine:
         final_url = search_url.replace("{keyword}", encoded_keyword)
         
         try:
-            response = self.session.get(final_url)
+            response = self._get(final_url)
             if response.status_code == 404:
                 return final_url, None
             
             response.raise_for_status()
-            return final_url, BeautifulSoup(response.text, 'html.parser')
+            return final_url, BeautifulSoup(response.text, 'lxml')
             
         except requests.RequestException as e:
             raise Exception(f"Failed to search subjects: {e}")
@@ -105,30 +143,29 @@ class SelectorMediaSourceEngine:
             return None
         
         try:
-            # Use PyQuery for better CSS selector support
-            doc = pq(str(document))
+            format_config = config.subject_format_config
+            name_selector = compile_selector(format_config.name_selector)
+            url_selector = compile_selector(format_config.url_selector)
             subjects = []
             
-            # Select subject elements
-            subject_elements = doc(config.subject_format_config.subject_selector)
+            # Select subject elements directly on the parsed tree
+            subject_elements = compile_selector(format_config.subject_selector).select(document)
             
             for i, element in enumerate(subject_elements):
-                el = pq(element)
-                
                 # Extract name
-                name_el = el(config.subject_format_config.name_selector)
-                if not name_el:
+                name_el = self._select_in(name_selector, element)
+                if name_el is None:
                     continue
-                name = name_el.text().strip()
+                name = self._element_text(name_el)
                 if not name:
                     continue
                 
                 # Extract URL
-                url_el = el(config.subject_format_config.url_selector)
-                if not url_el:
+                url_el = self._select_in(url_selector, element)
+                if url_el is None:
                     continue
                 
-                partial_url = url_el.attr('href') or url_el.text().strip()
+                partial_url = url_el.get('href') or self._element_text(url_el)
                 if not partial_url:
                     continue
                 
@@ -158,12 +195,12 @@ class SelectorMediaSourceEngine:
         Returns None for 404.
         """
         try:
-            response = self.session.get(subject_details_page_url)
+            response = self._get(subject_details_page_url)
             if response.status_code == 404:
                 return None
             
             response.raise_for_status()
-            return BeautifulSoup(response.text, 'html.parser')
+            return BeautifulSoup(response.text, 'lxml')
             
         except requests.RequestException as e:
             raise Exception(f"Failed to search episodes: {e}")
@@ -182,29 +219,31 @@ class SelectorMediaSourceEngine:
             parsed = urlparse(subject_url)
             base_url = f"{parsed.scheme}://{parsed.netloc}{'/'.join(parsed.path.split('/')[:-1])}"
             
-            doc = pq(str(subject_details_page))
+            format_config = config.channel_format_config
+            name_selector = compile_selector(format_config.name_selector)
+            url_selector = compile_selector(format_config.url_selector)
+            channel_selector = (compile_selector(format_config.channel_selector)
+                                if format_config.channel_selector else None)
             episodes = []
             
-            # Select episode elements
-            episode_elements = doc(config.channel_format_config.episode_selector)
+            # Select episode elements directly on the parsed tree
+            episode_elements = compile_selector(format_config.episode_selector).select(subject_details_page)
             
             for element in episode_elements:
-                el = pq(element)
-                
                 # Extract episode name
-                name_el = el(config.channel_format_config.name_selector)
-                if not name_el:
+                name_el = self._select_in(name_selector, element)
+                if name_el is None:
                     continue
-                name = name_el.text().strip()
+                name = self._element_text(name_el)
                 if not name:
                     continue
                 
                 # Extract play URL
-                url_el = el(config.channel_format_config.url_selector)
-                if not url_el:
+                url_el = self._select_in(url_selector, element)
+                if url_el is None:
                     continue
                 
-                play_url = url_el.attr('href') or url_el.text().strip()
+                play_url = url_el.get('href') or self._element_text(url_el)
                 if not play_url:
                     continue
                 
@@ -214,10 +253,10 @@ class SelectorMediaSourceEngine:
                 
                 # Extract channel if configured
                 channel = None
-                if config.channel_format_config.channel_selector:
-                    channel_el = el(config.channel_format_config.channel_selector)
-                    if channel_el:
-                        channel = channel_el.text().strip()
+                if channel_selector is not None:
+                    channel_el = self._select_in(channel_selector, element)
+                    if channel_el is not None:
+                        channel = self._element_text(channel_el)
                 
                 # Parse episode sort
                 episode_sort = self._parse_episode_sort(name)
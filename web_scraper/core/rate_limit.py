@@ -0,0 +1,151 @@
+"""
+Host Rate Limiter
+
+Per-host request throttling driven by the rate-limit headers servers send back,
+with the configured (or adaptive) request interval used only when the server
+gives no budget.
+"""
+
+import asyncio
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import Dict, Optional
+from urllib.parse import urlparse
+
+import requests
+
+
+def _parse_int(value: Optional[str]) -> Optional[int]:
+    """Parse an integer header value, ignoring malformed input"""
+    try:
+        return int(value) if value is not None else None
+    except ValueError:
+        return None
+
+
+def _parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Parse Retry-After given either as delta seconds or as an HTTP date"""
+    if not value:
+        return None
+    seconds = _parse_int(value.strip())
+    if seconds is not None:
+        return max(seconds, 0)
+    try:
+        return max(parsedate_to_datetime(value).timestamp() - time.time(), 0.0)
+    except (TypeError, ValueError):
+        return None
+
+
+def _parse_reset(value: Optional[str]) -> Optional[float]:
+    """Parse a RateLimit reset header given either as delta seconds or as a unix timestamp"""
+    seconds = _parse_int(value)
+    if seconds is None:
+        return None
+    # Values this large are absolute epoch timestamps, not deltas
+    if seconds > 1_000_000_000:
+        return max(seconds - time.time(), 0.0)
+    return max(seconds, 0)
+
+
+class HostRateLimiter:
+    """
+    Thread-safe per-host throttle.
+
+    - While the last response reported remaining budget (X-RateLimit-Remaining /
+      RateLimit-Remaining), requests go out back to back.
+    - Retry-After and exhausted-budget reset headers push the next slot out as far
+      as the server asks.
+    - Otherwise requests are spaced by ``interval_seconds``, or, when ``adaptive``
+      is set, by a per-host interval that starts at ``ADAPTIVE_MIN_INTERVAL``,
+      halves after each healthy response and doubles (with jitter) after a
+      429/5xx, capped at ``interval_seconds``.
+    """
+
+    RETRY_STATUS_CODES = frozenset((429, 503))
+    ADAPTIVE_MIN_INTERVAL = 0.2
+    ADAPTIVE_JITTER = 0.1
+
+    def __init__(self, interval_seconds: float = 0.0, backoff_base: float = 1.0,
+                 backoff_max: float = 60.0, adaptive: bool = False):
+        self.interval_seconds = interval_seconds
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.adaptive = adaptive
+        self._lock = threading.Lock()
+        self._next_allowed: Dict[str, float] = {}
+        self._remaining: Dict[str, int] = {}
+        self._adaptive_interval: Dict[str, float] = {}
+
+    @staticmethod
+    def _host(url: str) -> str:
+        return urlparse(url).netloc
+
+    def reserve(self, url: str) -> float:
+        """Reserve the next request slot for the URL's host; returns seconds to wait"""
+        host = self._host(url)
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next_allowed.get(host, 0.0))
+            remaining = self._remaining.get(host)
+            if remaining:
+                self._remaining[host] = remaining - 1
+                interval = 0.0
+            elif self.adaptive:
+                interval = self._adaptive_interval.get(host, self.ADAPTIVE_MIN_INTERVAL)
+            else:
+                interval = self.interval_seconds
+            self._next_allowed[host] = start + interval
+            return start - now
+
+    def acquire(self, url: str):
+        """Block until a request to the URL's host is allowed"""
+        wait_time = self.reserve(url)
+        if wait_time > 0:
+            time.sleep(wait_time)
+
+    async def acquire_async(self, url: str):
+        """Async variant of acquire()"""
+        wait_time = self.reserve(url)
+        if wait_time > 0:
+            await asyncio.sleep(wait_time)
+
+    def update_from(self, url: str, response: requests.Response):
+        """Record the rate-limit state advertised by a response"""
+        headers = response.headers
+        remaining = _parse_int(headers.get('X-RateLimit-Remaining') or headers.get('RateLimit-Remaining'))
+        delay = _parse_retry_after(headers.get('Retry-After'))
+        if delay is None and remaining == 0:
+            delay = _parse_reset(headers.get('X-RateLimit-Reset') or headers.get('RateLimit-Reset'))
+
+        host = self._host(url)
+        with self._lock:
+            if remaining is not None:
+                self._remaining[host] = remaining
+            if delay:
+                self._next_allowed[host] = max(self._next_allowed.get(host, 0.0),
+                                               time.monotonic() + delay)
+            if self.adaptive:
+                self._adapt_interval(host, response.status_code)
+
+    def _adapt_interval(self, host: str, status_code: int):
+        """Shrink the host's interval on success, grow it on throttling; caller holds the lock"""
+        interval = self._adaptive_interval.get(host, self.ADAPTIVE_MIN_INTERVAL)
+        if status_code in self.RETRY_STATUS_CODES or status_code >= 500:
+            interval = min(interval * 2 + random.uniform(0, self.ADAPTIVE_JITTER),
+                           max(self.interval_seconds, self.ADAPTIVE_MIN_INTERVAL))
+        else:
+            interval = max(interval * 0.5, self.ADAPTIVE_MIN_INTERVAL)
+        self._adaptive_interval[host] = interval
+
+    def backoff(self, url: str, attempt: int) -> float:
+        """Push the host back exponentially after a throttled response; returns seconds to wait"""
+        host = self._host(url)
+        with self._lock:
+            now = time.monotonic()
+            backoff = min(self.backoff_base * (2 ** attempt), self.backoff_max)
+            next_allowed = max(self._next_allowed.get(host, 0.0), now + backoff)
+            self._next_allowed[host] = next_allowed
+            self._remaining.pop(host, None)
+            return next_allowed - now
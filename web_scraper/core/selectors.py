@@ -0,0 +1,38 @@
+"""
+Compiled CSS selector cache
+
+Selector strings come from fixed configuration and are reused for every page,
+so each one is compiled by soupsieve once and shared across sources.
+"""
+
+from dataclasses import fields
+from functools import lru_cache
+
+import soupsieve
+
+from ..utils.logger import logger
+
+
+@lru_cache(maxsize=512)
+def compile_selector(selector: str) -> soupsieve.SoupSieve:
+    """Compile a CSS selector, reusing the compiled matcher for repeated strings"""
+    return soupsieve.compile(selector)
+
+
+def precompile_selectors(*format_configs) -> None:
+    """
+    Warm the selector cache from the ``*_selector`` fields of format configs,
+    so the first page parsed pays no compile cost.
+
+    Invalid selectors are skipped here; they still fail (and are reported)
+    when actually used.
+    """
+    for format_config in format_configs:
+        for config_field in fields(format_config):
+            selector = getattr(format_config, config_field.name)
+            if not config_field.name.endswith('_selector') or not selector:
+                continue
+            try:
+                compile_selector(selector)
+            except soupsieve.SelectorSyntaxError as e:
+                logger.debug("无法预编译选择器 '{}': {}", selector, e)
@@ -4,7 +4,6 @@ Selector Media Source - Python port of Kotlin SelectorMediaSource
 Main media source class that orchestrates the CSS selector-based scraping process.
 """
 
-import time
 import asyncio
 from typing import List, Optional, Iterator, Dict, Any
 import requests
@@ -15,6 +14,7 @@ from ..models import (
     SelectorSearchQuery, EpisodeSort, MatchKind
 )
 from .engine import SelectorMediaSourceEngine
+from .selectors import precompile_selectors
 
 
 class ConnectionStatus:
@@ -41,7 +41,10 @@ class SelectorMediaSource:
         self.media_source_id = media_source_id
         self.config = config
         self.engine = SelectorMediaSourceEngine(session)
-        self._last_search_time = 0.0
+        # The configured interval only applies while the server advertises no budget
+        self.engine.rate_limiter.interval_seconds = config.request_interval_seconds
+        self.engine.rate_limiter.adaptive = config.backoff_policy == "adaptive"
+        precompile_selectors(config.subject_format_config, config.channel_format_config)
     
     @property
     def info(self) -> Dict[str, Any]:
@@ -56,24 +59,13 @@ class SelectorMediaSource:
     def check_connection(self) -> str:
         """Check connection to the media source"""
         try:
-            response = requests.get(self.config.search_url, timeout=10)
+            response = self.engine.session.get(self.config.search_url, timeout=10)
             if response.status_code in [200, 401, 403]:  # Any non-network error is OK
                 return ConnectionStatus.SUCCESS
             return ConnectionStatus.FAILED
         except requests.RequestException:
             return ConnectionStatus.FAILED
     
-    async def _delay_until_next_allowed_search(self):
-        """Implement request rate limiting"""
-        current_time = time.time()
-        elapsed = current_time - self._last_search_time
-        wait_time = self.config.request_interval_seconds - elapsed
-        
-        if wait_time > 0:
-            await asyncio.sleep(wait_time)
-        
-        self._last_search_time = time.time()
-    
     def _check_player_support(self) -> bool:
         """Check if current platform player is supported"""
         if not self.config.only_supports_players:
@@ -95,8 +87,6 @@ class SelectorMediaSource:
         """
         Perform complete search operation: search subjects -> get episodes -> extract media
         """
-        await self._delay_until_next_allowed_search()
-        
         if not self._check_player_support():
             logger.warning(f"播放器不受支持。支持的播放器: {self.config.only_supports_players}")
             return []
@@ -153,51 +143,47 @@ class SelectorMediaSource:
             logger.error(f"搜索错误: {e}")
             return []
     
+    @staticmethod
+    def _run_coroutine(coro):
+        """Run a coroutine to completion from synchronous code"""
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            # No running event loop, safe to use asyncio.run
+            return asyncio.run(coro)
+        
+        # If we're already in an event loop, run the coroutine on a helper thread
+        import concurrent.futures
+        with concurrent.futures.ThreadPoolExecutor(max_workers=1) as executor:
+            return executor.submit(asyncio.run, coro).result()
+    
     def fetch(self, query: MediaFetchRequest) -> Iterator[MediaMatch]:
         """
         Fetch media matches for the given query.
         Uses asyncio for the search but provides synchronous interface.
+        
+        Each subject name's search (including all of its episode pages) runs
+        to completion before its matches are yielded; a caller that stops
+        early only skips the searches for the subject names after it.
         """
-        async def _async_fetch():
-            all_matches = []
-            
-            # Process each subject name (limited by config)
-            subject_names = query.subject_names[:self.config.search_use_subject_names_count]
+        # Process each subject name (limited by config)
+        subject_names = query.subject_names[:self.config.search_use_subject_names_count]
+        all_subject_names = set(query.subject_names)
+        
+        for subject_name in subject_names:
+            search_query = SelectorSearchQuery(
+                subject_name=subject_name,
+                all_subject_names=all_subject_names,
+                episode_sort=query.episode_sort or EpisodeSort("1"),
+                episode_ep=query.episode_ep,
+                episode_name=query.episode_name,
+            )
             
-            for subject_name in subject_names:
-                search_query = SelectorSearchQuery(
-                    subject_name=subject_name,
-                    all_subject_names=set(query.subject_names),
-                    episode_sort=query.episode_sort or EpisodeSort("1"),
-                    episode_ep=query.episode_ep,
-                    episode_name=query.episode_name,
-                )
-                
-                media_list = await self.search(self.config, search_query)
-                
-                # Convert to MediaMatch objects
-                for media in media_list:
-                    all_matches.append(MediaMatch(media, MatchKind.FUZZY))
-                
-                # Add delay between different subject searches
-                if len(subject_names) > 1:
-                    await asyncio.sleep(self.config.request_interval_seconds)
+            media_list = self._run_coroutine(self.search(self.config, search_query))
             
-            return all_matches
-        
-        # Run async function - handle existing event loop
-        try:
-            loop = asyncio.get_running_loop()
-            # If we're already in an event loop, create a new thread to run the async code
-            import concurrent.futures
-            with concurrent.futures.ThreadPoolExecutor() as executor:
-                future = executor.submit(asyncio.run, _async_fetch())
-                matches = future.result()
-        except RuntimeError:
-            # No running event loop, safe to use asyncio.run
-            matches = asyncio.run(_async_fetch())
-        
-        return iter(matches)
+            # Convert to MediaMatch objects
+            for media in media_list:
+                yield MediaMatch(media, MatchKind.FUZZY)
     
     def match_web_video(self, url: str) -> Dict[str, Any]:
         """Match and extract video information from URL"""
@@ -12,8 +12,10 @@ import time
 from abc import ABC, abstractmethod
 from typing import List, Optional, Iterator
 import requests
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, SoupStrainer
 from ..utils.logger import logger
+from ..utils.helpers import join_url
+from .selectors import compile_selector
 
 from ..models import (
     Bangumi, Episode, MediaFetchRequest, MediaMatch, Media,
@@ -42,6 +44,9 @@ class ThreeStepWebMediaSource(ABC):
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
         })
         self.subtitle_languages = ["CHS"]
+        # Optional parse-time filters; subtrees they reject are never built
+        self.search_strainer: Optional[SoupStrainer] = None
+        self.episode_strainer: Optional[SoupStrainer] = None
     
     @abstractmethod
     def parse_bangumi_search(self, document: BeautifulSoup) -> List[Bangumi]:
@@ -75,6 +80,10 @@ class ThreeStepWebMediaSource(ABC):
         
         return EpisodeSort(clean_name)
     
+    def _parse_html(self, html: str, strainer: Optional[SoupStrainer] = None) -> BeautifulSoup:
+        """Parse a fetched page with the C-backed lxml tree builder"""
+        return BeautifulSoup(html, 'lxml', parse_only=strainer)
+    
     def create_media_match(self, bangumi: Bangumi, episode: Episode) -> MediaMatch:
         """Create MediaMatch from bangumi and episode information"""
         sort = self._parse_episode_sort(episode.name)
@@ -184,7 +193,7 @@ class ThreeStepWebMediaSource(ABC):
             try:
                 response = self.session.get(bangumi.url)
                 response.raise_for_status()
-                document = BeautifulSoup(response.text, 'html.parser')
+                document = self._parse_html(response.text, self.episode_strainer)
                 return self.parse_episode_list(document)
                 
             except Exception as e:
@@ -219,24 +228,22 @@ class SimpleThreeStepWebMediaSource(ThreeStepWebMediaSource):
         bangumi_list = []
         config = self.search_config.get('bangumi', {})
         
-        items = document.select(config.get('item_selector', '.search-item'))
+        items = compile_selector(config.get('item_selector', '.search-item')).select(document)
         
         for i, item in enumerate(items):
             try:
                 # Extract name
-                name_elem = item.select_one(config.get('name_selector', '.title'))
+                name_elem = compile_selector(config.get('name_selector', '.title')).select_one(item)
                 if not name_elem:
                     continue
                 name = name_elem.get_text(strip=True)
                 
                 # Extract URL
-                url_elem = item.select_one(config.get('url_selector', 'a'))
+                url_elem = compile_selector(config.get('url_selector', 'a')).select_one(item)
                 if not url_elem or not url_elem.get('href'):
                     continue
                 
-                url = url_elem['href']
-                if not url.startswith('http'):
-                    url = f"{self.base_url}{url}"
+                url = join_url(self.base_url, url_elem['href'])
                 
                 # Generate internal ID
                 internal_id = f"{i}_{hash(name) % 10000}"
@@ -264,7 +271,7 @@ class SimpleThreeStepWebMediaSource(ThreeStepWebMediaSource):
         try:
             response = self.session.get(search_url)
             response.raise_for_status()
-            document = BeautifulSoup(response.text, 'html.parser')
+            document = self._parse_html(response.text, self.search_strainer)
             return self.parse_bangumi_search(document)
             
         except Exception as e:
@@ -276,30 +283,28 @@ class SimpleThreeStepWebMediaSource(ThreeStepWebMediaSource):
         episodes = []
         config = self.search_config.get('episode', {})
         
-        items = document.select(config.get('item_selector', '.episode-item'))
+        items = compile_selector(config.get('item_selector', '.episode-item')).select(document)
         
         for item in items:
             try:
                 # Extract episode name
-                name_elem = item.select_one(config.get('name_selector', '.episode-title'))
+                name_elem = compile_selector(config.get('name_selector', '.episode-title')).select_one(item)
                 if not name_elem:
                     continue
                 name = name_elem.get_text(strip=True)
                 
                 # Extract episode URL
-                url_elem = item.select_one(config.get('url_selector', 'a'))
+                url_elem = compile_selector(config.get('url_selector', 'a')).select_one(item)
                 if not url_elem or not url_elem.get('href'):
                     continue
                 
-                url = url_elem['href']
-                if not url.startswith('http'):
-                    url = f"{self.base_url}{url}"
+                url = join_url(self.base_url, url_elem['href'])
                 
                 # Extract channel (optional)
                 channel = None
                 channel_selector = config.get('channel_selector')
                 if channel_selector:
-                    channel_elem = item.select_one(channel_selector)
+                    channel_elem = compile_selector(channel_selector).select_one(item)
                     if channel_elem:
                         channel = channel_elem.get_text(strip=True)
                 
@@ -8,7 +8,7 @@ This module provides format handlers for different types of website layouts:
 
 from abc import ABC, abstractmethod
 from typing import List, Optional, Dict, Any
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, Tag
 from pyquery import PyQuery as pq
 from urllib.parse import urljoin
 from ..utils.logger import logger
@@ -17,6 +17,18 @@ from ..models import WebSearchSubjectInfo, WebSearchEpisodeInfo, EpisodeSort
 from ..utils import parse_episode_number
 
 
+def _to_pyquery(document) -> pq:
+    """
+    Wrap a document for PyQuery.
+    
+    HTML strings, lxml elements and PyQuery objects are used as is; only
+    BeautifulSoup trees have to be serialized and re-parsed.
+    """
+    if isinstance(document, Tag):
+        return pq(str(document))
+    return pq(document)
+
+
 class SelectorFormatId:
     """Format ID constants"""
     SUBJECT_FORMAT_A = "subject_format_a"
@@ -79,7 +91,7 @@ class SelectorSubjectFormatA(SelectorSubjectFormat):
             return []
         
         try:
-            doc = pq(str(document))
+            doc = _to_pyquery(document)
             subjects = []
             
             subject_elements = doc(config['subject_selector'])
@@ -148,7 +160,7 @@ class SelectorSubjectFormatIndexed(SelectorSubjectFormat):
             return []
         
         try:
-            doc = pq(str(document))
+            doc = _to_pyquery(document)
             subjects = []
             
             # Find container first
@@ -214,7 +226,7 @@ class SelectorChannelFormatNoChannel(SelectorChannelFormat):
             return []
         
         try:
-            doc = pq(str(document))
+            doc = _to_pyquery(document)
             episodes = []
             
             episode_elements = doc(config['episode_selector'])
@@ -285,7 +297,7 @@ class SelectorChannelFormatIndexGrouped(SelectorChannelFormat):
             return []
         
         try:
-            doc = pq(str(document))
+            doc = _to_pyquery(document)
             episodes = []
             
             # Find channel containers
@@ -3,10 +3,30 @@ Configuration models for web scraper - Python port of Kotlin config classes
 """
 
 from dataclasses import dataclass, field
-from typing import List, Optional
+from functools import lru_cache
+from typing import List, Optional, Tuple, Union
 import re
 
 
+def _compile_or_none(pattern: Union[str, re.Pattern]) -> Optional[re.Pattern]:
+    """Compile a regex, returning None if it is invalid"""
+    if isinstance(pattern, re.Pattern):
+        return pattern
+    try:
+        return re.compile(pattern)
+    except re.error:
+        return None
+
+
+@lru_cache(maxsize=64)
+def _split_search_url(search_url: str) -> Optional[Tuple[str, str]]:
+    """Split a search URL template around its single {keyword} placeholder"""
+    prefix, placeholder, suffix = search_url.partition("{keyword}")
+    if not placeholder or "{keyword}" in suffix:
+        return None
+    return prefix, suffix
+
+
 @dataclass
 class VideoHeaders:
     """Video request headers configuration"""
@@ -14,30 +34,37 @@ class VideoHeaders:
     user_agent: str = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/58.0.3029.110 Safari/537.3"
 
 
-@dataclass
+@dataclass(frozen=True)
 class MatchVideoConfig:
-    """Video matching configuration"""
+    """
+    Video matching configuration.
+    
+    The URL patterns may be given as strings or precompiled ``re.Pattern``
+    objects; either way they are compiled once when the config is created.
+    The config is frozen so the compiled patterns always match the fields;
+    use ``dataclasses.replace`` to derive a config with different patterns.
+    """
     enable_nested_url: bool = True
-    match_nested_url: str = r"^.+(m3u8|vip|xigua\.php).+\?"
-    match_video_url: str = r"(^http(s)?:\/\/(?!.*http(s)?:\/\/).+((\.mp4)|(\.mkv)|(m3u8)).*(\?.+)?)|(akamaized)|(bilivideo.com)"
+    match_nested_url: Union[str, re.Pattern] = r"^.+(m3u8|vip|xigua\.php).+\?"
+    match_video_url: Union[str, re.Pattern] = r"(^http(s)?:\/\/(?!.*http(s)?:\/\/).+((\.mp4)|(\.mkv)|(m3u8)).*(\?.+)?)|(akamaized)|(bilivideo.com)"
     cookies: str = "quality=1080"
     add_headers_to_video: VideoHeaders = field(default_factory=VideoHeaders)
     
+    def __post_init__(self):
+        # Patterns are kept as given, so dataclasses.replace() preserves the
+        # flags of precompiled ones; the frozen instance needs object.__setattr__
+        object.__setattr__(self, '_nested_url_re', _compile_or_none(self.match_nested_url))
+        object.__setattr__(self, '_video_url_re', _compile_or_none(self.match_video_url))
+    
     @property
     def match_nested_url_regex(self) -> Optional[re.Pattern]:
         """Get compiled regex for nested URL matching"""
-        try:
-            return re.compile(self.match_nested_url)
-        except re.error:
-            return None
+        return self._nested_url_re
     
     @property
     def match_video_url_regex(self) -> Optional[re.Pattern]:
         """Get compiled regex for video URL matching"""
-        try:
-            return re.compile(self.match_video_url)
-        except re.error:
-            return None
+        return self._video_url_re
 
 
 @dataclass
@@ -90,6 +117,9 @@ class SelectorSearchConfig:
     search_use_subject_names_count: int = 1
     raw_base_url: str = ""
     request_interval_seconds: float = 3.0
+    # "fixed" spaces requests by request_interval_seconds; "adaptive" starts short
+    # and only backs off, up to request_interval_seconds, when the server answers 429/5xx
+    backoff_policy: str = "fixed"
     
     # Phase 2: Subject selection
     subject_format_id: str = "subject_format_a"
@@ -112,6 +142,14 @@ class SelectorSearchConfig:
     select_media: SelectMediaConfig = field(default_factory=SelectMediaConfig)
     match_video: MatchVideoConfig = field(default_factory=MatchVideoConfig)
     
+    def build_search_url(self, encoded_keyword: str) -> str:
+        """Fill the {keyword} placeholder of search_url with an already-encoded keyword"""
+        parts = _split_search_url(self.search_url)
+        if parts is None:
+            return self.search_url.replace("{keyword}", encoded_keyword)
+        prefix, suffix = parts
+        return f"{prefix}{encoded_keyword}{suffix}"
+    
     @property
     def final_base_url(self) -> str:
         """Get final base URL, guessing if not provided"""
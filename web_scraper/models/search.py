@@ -2,10 +2,15 @@
 Search models for web scraper - Python port of Kotlin search classes
 """
 
+import sys
 from dataclasses import dataclass
 from typing import Optional, Set
 from .media import EpisodeSort
 
+# Slotted dataclasses (Python 3.10+) drop the per-instance __dict__ for
+# records that are created in bulk while parsing result pages
+_SLOTS = {'slots': True} if sys.version_info >= (3, 10) else {}
+
 
 @dataclass
 class WebSearchSubjectInfo:
@@ -43,7 +48,7 @@ class SelectorSearchQuery:
     episode_name: Optional[str]
 
 
-@dataclass
+@dataclass(**_SLOTS)
 class Bangumi:
     """Bangumi/anime series information"""
     internal_id: str
@@ -51,7 +56,7 @@ class Bangumi:
     url: str
 
 
-@dataclass
+@dataclass(**_SLOTS)
 class Episode:
     """Episode information"""
     name: str
@@ -0,0 +1,58 @@
+"""
+Concurrent query helpers for web scraper
+"""
+
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Iterable, Iterator, List, Tuple, Union
+
+from ..models import MediaFetchRequest, EpisodeSort, MediaMatch
+
+
+def iter_queries_concurrently(source, queries: Iterable[str], max_workers: int = 4
+                              ) -> Iterator[Tuple[str, Union[List[MediaMatch], Exception]]]:
+    """
+    Fetch one subject name per query on a thread pool.
+    
+    Yields (query, matches) in completion order, where matches is the list of
+    matches or the exception the fetch raised. When the caller stops early
+    (break/return), queries that have not started are cancelled, and running
+    fetches stop before their next subject-name search. The generator waits
+    for them to wind down before returning, so none of them is still using
+    the source's session once the caller moves on (e.g. closes it).
+    
+    Args:
+        source: Media source whose fetch() is called for each query
+        queries: Subject names to search for
+        max_workers: Maximum number of fetches running at once
+    """
+    cancelled = threading.Event()
+    
+    def _fetch(query):
+        if cancelled.is_set():
+            return []
+        request = MediaFetchRequest(
+            subject_names=[query],
+            episode_sort=EpisodeSort(1)
+        )
+        matches = []
+        # fetch() is lazy per subject name, so checking between items stops
+        # the fetch before it starts another search
+        for match in source.fetch(request):
+            if cancelled.is_set():
+                break
+            matches.append(match)
+        return matches
+    
+    executor = ThreadPoolExecutor(max_workers=max_workers)
+    try:
+        futures = {executor.submit(_fetch, query): query for query in queries}
+        for future in as_completed(futures):
+            try:
+                matches = future.result()
+            except Exception as e:
+                matches = e
+            yield futures[future], matches
+    finally:
+        cancelled.set()
+        executor.shutdown(wait=True, cancel_futures=True)
@@ -3,8 +3,9 @@ Utility helper functions for web scraper
 """
 
 import re
+from functools import lru_cache
 from typing import Optional
-from urllib.parse import quote_plus
+from urllib.parse import quote_plus, urljoin
 
 
 def encode_url_segment(text: str) -> str:
@@ -12,11 +13,26 @@ def encode_url_segment(text: str) -> str:
     return quote_plus(text)
 
 
+@lru_cache(maxsize=4096)
+def join_url(base_url: str, href: str) -> str:
+    """
+    Resolve a scraped link against a base URL.
+    
+    Cached because a page repeats the same base URL for every link on it.
+    """
+    if href.startswith(('http://', 'https://')):
+        return href
+    return urljoin(base_url, href)
+
+
+@lru_cache(maxsize=4096)
 def get_search_keyword(subject_name: str, remove_special: bool = True, 
                       use_only_first_word: bool = True) -> str:
     """
     Extract search keyword from subject name.
     
+    Cached because the same subject name is searched repeatedly.
+    
     Args:
         subject_name: The original subject name
         remove_special: Whether to remove special characters
@@ -39,10 +55,13 @@ def get_search_keyword(subject_name: str, remove_special: bool = True,
     return keyword.strip()
 
 
+@lru_cache(maxsize=4096)
 def parse_episode_number(episode_name: str) -> Optional[int]:
     """
     Parse episode number from episode name.
     
+    Cached because sites reuse the same episode names across subjects and channels.
+    
     Supports patterns like:
     - 第1集, 第01集
     - 第1话, 第01话  
@@ -128,10 +147,13 @@ def normalize_title(title: str) -> str:
     return title.strip()
 
 
+@lru_cache(maxsize=4096)
 def extract_quality_info(title: str) -> Optional[str]:
     """
     Extract video quality information from title.
     
+    Cached because the same title tags repeat across every episode of a release.
+    
     Args:
         title: Title to extract quality from
         
@@ -153,10 +175,13 @@ def extract_quality_info(title: str) -> Optional[str]:
     return None
 
 
+@lru_cache(maxsize=4096)
 def extract_subtitle_language(text: str) -> Optional[str]:
     """
     Extract subtitle language from text.
     
+    Cached for the same reason as extract_quality_info().
+    
     Args:
         text: Text to extract language from
         
@@ -0,0 +1,27 @@
+"""
+HTTP session helpers for web scraper
+"""
+
+import requests
+from requests.adapters import HTTPAdapter
+
+
+def create_shared_session(pool_connections: int = 4, pool_maxsize: int = 16) -> requests.Session:
+    """
+    Create a session meant to be shared by several sources or queries.
+    
+    The pooled adapter keeps TCP/TLS connections alive between requests, and
+    pool_maxsize should cover the number of threads issuing requests at once.
+    
+    Args:
+        pool_connections: Number of per-host connection pools to cache
+        pool_maxsize: Maximum connections kept in each pool
+    
+    Returns:
+        A requests session with the pooled adapter mounted for http and https
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session